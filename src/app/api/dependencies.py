@@ -0,0 +1,46 @@
+from typing import Any
+
+import orjson
+from fastapi import HTTPException, Request, status
+
+from ..models.user import User
+
+
+def require_db_user(request: Request) -> User:
+    """
+    Return the authenticated database user attached to request.state by ClerkAuthMiddleware.
+
+    Raises:
+        HTTPException: If the request has no authenticated user
+    """
+    db_user = getattr(request.state, "db_user", None)
+    if db_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    return db_user
+
+
+async def optional_json_body(request: Request) -> dict[str, Any]:
+    """
+    Return the JSON object sent in the request body, or an empty dict when there is no body.
+
+    Empty requests skip JSON parsing entirely.
+
+    Raises:
+        HTTPException: If the body is not a JSON object
+    """
+    if request.headers.get("content-length", "0") == "0" and "transfer-encoding" not in request.headers:
+        return {}
+
+    body = await request.body()
+    if not body:
+        return {}
+    try:
+        data = orjson.loads(body)
+    except orjson.JSONDecodeError:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Invalid JSON body")
+    if not isinstance(data, dict):
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Request body must be a JSON object")
+    return data
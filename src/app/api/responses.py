@@ -0,0 +1,18 @@
+from typing import Any
+
+from fastapi import Response
+
+from ..models.user import UserRead
+
+
+def user_read_response(user: Any) -> Response:
+    """
+    Serialize a user as UserRead straight to a JSON response.
+
+    Routes that return this bypass FastAPI's response_model validation. That is only safe because
+    every value passed in comes from our own service layer or the auth middleware: UserRead
+    instances (e.g. from the user read caches) are dumped as-is, while ORM rows and crud dicts
+    are validated once here.
+    """
+    user_read = user if isinstance(user, UserRead) else UserRead.model_validate(user)
+    return Response(content=user_read.model_dump_json(), media_type="application/json")
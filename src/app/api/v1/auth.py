@@ -2,13 +2,14 @@
 Authentication endpoints using Clerk
 """
 import logging
-from typing import Dict, Any, Union, Annotated
+from typing import Dict, Any
 
 from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 from ...core.clerk.client import (
     get_session_info,
 )
+from ..responses import user_read_response
 from ...models.user import UserRead
 
 router = APIRouter(tags=["auth"])
@@ -29,9 +30,10 @@ async def get_me(
         HTTPException: If the user is not authenticated or not found in the database
     """
     # Check if db_user is in request.state (set by middleware)
-    if hasattr(request.state, "db_user") and request.state.db_user is not None:
+    db_user = getattr(request.state, "db_user", None)
+    if db_user is not None:
         logging.info("Using db_user from request.state")
-        return request.state.db_user
+        return user_read_response(db_user)
     
     # If db_user is not in request.state, return unauthorized
     logging.warning("No db_user found in request.state, returning unauthorized")
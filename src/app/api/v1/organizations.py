@@ -1,31 +1,29 @@
 from typing import Annotated, List
 import logging
-import traceback
-import sys
 
-# Configure root logger to output to stderr
-root_logger = logging.getLogger()
-if not root_logger.handlers:
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    root_logger.addHandler(handler)
-    root_logger.setLevel(logging.INFO)
-
-from fastapi import APIRouter, Depends, Request, Body, HTTPException, status
+from fastapi import APIRouter, Depends, Response, Body, HTTPException, status
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...core.db.database import async_get_db
+from ..dependencies import require_db_user
+from ...core.db.database import async_get_db, async_get_db_read
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
 from ...core.service import organization_service
 from ...models.organization import OrganizationCreate, OrganizationRead, OrganizationUpdate
-from ...models.user import UserRead
+from ...models.user import User, UserRead
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(tags=["organizations"])
 
+# Built once so listing users serializes straight to JSON bytes instead of going through
+# FastAPI's per-item response_model validation and jsonable_encoder
+_user_list_adapter = TypeAdapter(List[UserRead])
+
 
 @router.post("/organization", response_model=OrganizationRead)
 async def create_organization(
-    request: Request,
+    db_user: Annotated[User, Depends(require_db_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
     organization_data: OrganizationCreate = Body(...)
 ) -> OrganizationRead:
@@ -37,117 +35,81 @@ async def create_organization(
     - The user creating the organization becomes associated with it
     - Optional org_url can be provided for a custom URL slug
     """
-    # Get the authenticated user from request state (set by middleware)
-    if not hasattr(request.state, "db_user"):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required to create an organization"
-        )
-    
-    # Validate and extract user ID
-    db_user = request.state.db_user
-    logging.info(f"Creating organization for user: {db_user}")
+    logger.debug("Creating organization for user %s: %s", db_user.id, organization_data)
     
     try:
-        # Log the user ID and organization data
-        logging.info(f"User ID: {db_user.id}, Organization data: {organization_data}")
-        
         # Call the service to handle business logic
-        result = await organization_service.create_organization(
+        return await organization_service.create_organization(
             db=db,
             id=db_user.id,
-            organization_data=organization_data
+            organization_data=organization_data,
+            db_user=db_user
         )
-        logging.info(f"Organization created successfully: {result}")
-        return result
-    except DuplicateValueException as e:
-        raise DuplicateValueException(str(e))
-    except NotFoundException as e:
-        raise NotFoundException(str(e))
+    except (DuplicateValueException, NotFoundException):
+        raise
     except Exception as e:
-        logging.error(f"Error creating organization: {str(e)}")
-        logging.error(traceback.format_exc())
+        logger.exception("Error creating organization")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating organization: {str(e)}"
-        )
+        ) from e
 
 
 @router.get("/organization/me", response_model=OrganizationRead)
 async def get_my_organization(
-    request: Request,
-    db: Annotated[AsyncSession, Depends(async_get_db)]
+    db_user: Annotated[User, Depends(require_db_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db_read)]
 ) -> OrganizationRead:
     """
     Get the organization associated with the authenticated user.
     """
-    # Get the authenticated user from request state (set by middleware)
-    if not hasattr(request.state, "clerk_user"):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required to get organization"
-        )
-    
-    # Validate and extract user ID
-    clerk_user = request.state.clerk_user
-    
     try:
         # Call the service to handle business logic
         return await organization_service.get_organization_by_user_id(
             db=db,
-            user_id=clerk_user.id
+            user_id=db_user.clerk_id,
+            db_user=db_user
         )
-    except NotFoundException as e:
-        raise NotFoundException(str(e))
+    except NotFoundException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error getting organization: {str(e)}"
-        )
+        ) from e
 
 
 @router.put("/organization/me", response_model=OrganizationRead)
 async def update_my_organization(
-    request: Request,
+    db_user: Annotated[User, Depends(require_db_user)],
     db: Annotated[AsyncSession, Depends(async_get_db)],
     organization_data: OrganizationUpdate = Body(...)
 ) -> OrganizationRead:
     """
     Update the organization associated with the authenticated user.
     """
-    # Get the authenticated user from request state (set by middleware)
-    if not hasattr(request.state, "clerk_user"):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required to update organization"
-        )
-    
-    # Validate and extract user ID
-    clerk_user = request.state.clerk_user
-    
     try:
         # Call the service to handle business logic
         return await organization_service.update_organization(
             db=db,
-            user_id=clerk_user.id,
-            organization_data=organization_data
+            user_id=db_user.clerk_id,
+            organization_data=organization_data,
+            db_user=db_user
         )
-    except DuplicateValueException as e:
-        raise DuplicateValueException(str(e))
-    except NotFoundException as e:
-        raise NotFoundException(str(e))
+    except (DuplicateValueException, NotFoundException):
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error updating organization: {str(e)}"
-        )
+        ) from e
 
 
 @router.get("/organization/users", response_model=List[UserRead])
 async def list_organization_users(
-    request: Request,
-    db: Annotated[AsyncSession, Depends(async_get_db)]
-) -> List[UserRead]:
+    db_user: Annotated[User, Depends(require_db_user)],
+    db: Annotated[AsyncSession, Depends(async_get_db_read)]
+) -> Response:
     """
     List all users under the authenticated user's organization.
     
@@ -155,26 +117,18 @@ async def list_organization_users(
     - All users within the same organization can see the list of users
     - Returns a list of users with their basic information
     """
-    # Get the authenticated user from request state (set by middleware)
-    if not hasattr(request.state, "clerk_user"):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required to list organization users"
-        )
-    
-    # Validate and extract user ID
-    clerk_user = request.state.clerk_user
-    
     try:
         # Call the service to handle business logic
-        return await organization_service.list_organization_users(
+        users = await organization_service.list_organization_users(
             db=db,
-            user_id=clerk_user.id
+            user_id=db_user.clerk_id,
+            db_user=db_user
         )
-    except NotFoundException as e:
-        raise NotFoundException(str(e))
+        return Response(content=_user_list_adapter.dump_json(users), media_type="application/json")
+    except NotFoundException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error listing organization users: {str(e)}"
-        )
+        ) from e
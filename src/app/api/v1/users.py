@@ -1,53 +1,55 @@
 from typing import Annotated, Any
 import logging
-import sys
-import traceback
-
-# Configure root logger to output to stderr
-root_logger = logging.getLogger()
-if not root_logger.handlers:
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    root_logger.addHandler(handler)
-    root_logger.setLevel(logging.INFO)
-
-from fastapi import APIRouter, Depends, Request, Body, HTTPException, status
+import operator
+
+from fastapi import APIRouter, Depends, Request, Response, Body, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from ...core.db.database import async_get_db
-from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from ..dependencies import optional_json_body
+from ..responses import user_read_response
+from ...core.clerk.client import invalidate_cached_clerk_user
+from ...core.db.database import async_get_db, async_get_db_read
+from ...core.exceptions.http_exceptions import NotFoundException
 from ...core.service import user_service
 from ...models.user import UserRead, UserUpdate
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(tags=["users"])
 
+_CLERK_USER_KEYS = ("id", "email", "first_name", "last_name", "profile_image_url")
+_get_clerk_user_fields = operator.attrgetter(*_CLERK_USER_KEYS)
+
+
+def _clerk_user_to_dict(clerk_user: Any) -> dict[str, Any]:
+    """Convert the clerk_user attached by the middleware to the dict the service layer expects"""
+    return dict(zip(_CLERK_USER_KEYS, _get_clerk_user_fields(clerk_user)))
+
 
 # New endpoint to get user by UUID (unauthenticated)
 @router.get("/user/{uuid}", response_model=UserRead)
 async def get_user_by_uuid(
-    request: Request,
     uuid: str,
-    db: Annotated[AsyncSession, Depends(async_get_db)]
-) -> UserRead:
+    db: Annotated[AsyncSession, Depends(async_get_db_read)]
+) -> Response:
     """
     Get user by UUID - unauthenticated endpoint
     """
     try:
         # Call the service to handle business logic
-        return await user_service.get_user_by_uuid(db=db, uuid=uuid)
-    except NotFoundException as e:
-        raise NotFoundException(str(e))
+        return user_read_response(await user_service.get_user_by_uuid(db=db, uuid=uuid))
+    except NotFoundException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error getting user: {str(e)}"
-        )
+        ) from e
 
 
 # New endpoint to create or update user by clerk_id without authentication
 @router.post("/user/clerk/{clerk_id}", response_model=UserRead)
 async def create_or_update_user_by_clerk_id(
-    request: Request,
     clerk_id: str,
     db: Annotated[AsyncSession, Depends(async_get_db)],
     user_data: UserUpdate = Body(...)
@@ -58,7 +60,7 @@ async def create_or_update_user_by_clerk_id(
     """
     try:
         # Convert Pydantic model to dict for the service layer
-        user_data_dict = user_data.model_dump(exclude_unset=True)
+        user_data_dict = user_data.model_dump(exclude_unset=True) if user_data.model_fields_set else {}
         
         # Call the service to handle business logic
         return await user_service.create_or_update_user_by_clerk_id(
@@ -66,21 +68,22 @@ async def create_or_update_user_by_clerk_id(
             clerk_id=clerk_id,
             user_data=user_data_dict
         )
-    except DuplicateValueException as e:
-        raise DuplicateValueException(str(e))
+    except HTTPException:
+        # Domain errors (duplicate email, missing required fields) keep their own status code
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error creating/updating user: {str(e)}"
-        )
+        ) from e
 
 
 # New endpoint to get current user from Clerk JWT
 @router.get("/user/me", response_model=UserRead)
 async def get_current_user(
     request: Request,
-    db: Annotated[AsyncSession, Depends(async_get_db)]
-) -> UserRead:
+    db: Annotated[AsyncSession, Depends(async_get_db_read)]
+) -> Response:
     """
     Get the current authenticated user
     
@@ -88,50 +91,40 @@ async def get_current_user(
     and attach the clerk_user to request.state
     """
     # Get the clerk_user from request.state (set by middleware)
-    if not hasattr(request.state, "clerk_user"):
-        logging.error("No clerk_user found in request.state")
+    clerk_user = getattr(request.state, "clerk_user", None)
+    if clerk_user is None:
+        logger.error("No clerk_user found in request.state")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required"
         )
         
-    logging.info("Found clerk_user in request.state, retrieving user data")
+    logger.debug("Found clerk_user in request.state, retrieving user data")
     
-    clerk_user = request.state.clerk_user
+    # The middleware has already synced the user with the database, so this is a pure read
+    db_user = getattr(request.state, "db_user", None)
+    if db_user is not None:
+        return user_read_response(db_user)
     
     try:
-        # Convert clerk_user to dict for the service layer
-        clerk_user_data = {
-            "id": clerk_user.id,
-            "email": clerk_user.email,
-            "first_name": clerk_user.first_name,
-            "last_name": clerk_user.last_name,
-            "profile_image_url": clerk_user.profile_image_url
-        }
-        
-        # Call the service to handle business logic
-        result = await user_service.update_user_from_clerk(
-            db=db,
-            clerk_user_data=clerk_user_data,
-            user_data={}
-        )
-        logging.info(f"Successfully retrieved user: {result}")
-        return result
+        result = await user_service.get_user_by_clerk_id(db=db, clerk_id=clerk_user.id)
+        logger.debug("Successfully retrieved user: %s", result)
+        return user_read_response(result)
+    except NotFoundException:
+        raise
     except Exception as e:
-        logging.error(f"Unhandled error in get_current_user endpoint: {str(e)}")
-        import traceback
-        logging.error(traceback.format_exc())
+        logger.exception("Unhandled error in get_current_user endpoint")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error retrieving user: {str(e)}"
-        )
+        ) from e
 
 # New endpoint to update or create user from Clerk JWT
 @router.post("/user/me", response_model=UserRead)
 async def update_user_from_clerk(
     request: Request,
     db: Annotated[AsyncSession, Depends(async_get_db)],
-    user_data: dict[str, Any] = Body(default={})
+    user_data: Annotated[dict[str, Any], Depends(optional_json_body)]
 ) -> UserRead:
     """
     Update or create user from Clerk JWT data
@@ -140,50 +133,41 @@ async def update_user_from_clerk(
     and attach the clerk_user to request.state
     """
     # Get the clerk_user from request.state (set by middleware)
-    if not hasattr(request.state, "clerk_user"):
-        logging.error("No clerk_user found in request.state")
+    clerk_user = getattr(request.state, "clerk_user", None)
+    if clerk_user is None:
+        logger.error("No clerk_user found in request.state")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Authentication required"
         )
         
-    logging.info("Found clerk_user in request.state, proceeding with user creation/update")
+    logger.debug("Found clerk_user in request.state, proceeding with user creation/update")
         
-    clerk_user = request.state.clerk_user
-    
     try:
         # Convert clerk_user to dict for the service layer
-        clerk_user_data = {
-            "id": clerk_user.id,
-            "email": clerk_user.email,
-            "first_name": clerk_user.first_name,
-            "last_name": clerk_user.last_name,
-            "profile_image_url": clerk_user.profile_image_url
-        }
+        clerk_user_data = _clerk_user_to_dict(clerk_user)
         
-        logging.info(f"Clerk user data: {clerk_user_data}")
+        logger.debug("Clerk user data: %s", clerk_user_data)
         
-        try:
-            # Call the service to handle business logic
-            result = await user_service.update_user_from_clerk(
-                db=db,
-                clerk_user_data=clerk_user_data,
-                user_data=user_data
-            )
-            logging.info(f"Successfully updated/created user: {result}")
-            return result
-        except Exception as service_error:
-            logging.error(f"Error in user_service.update_user_from_clerk: {str(service_error)}")
-            import traceback
-            logging.error(traceback.format_exc())
-            raise
+        # Call the service to handle business logic
+        result = await user_service.update_user_from_clerk(
+            db=db,
+            clerk_user_data=clerk_user_data,
+            user_data=user_data,
+            db_user=getattr(request.state, "db_user", None)
+        )
+        # The update went to the local database; drop the cached Clerk profile so it can't
+        # mask that update on the next lookup
+        invalidate_cached_clerk_user(clerk_user.id)
+        logger.debug("Successfully updated/created user: %s", result)
+        return result
+    except HTTPException:
+        raise
     except Exception as e:
-        logging.error(f"Unhandled error in update_user_from_clerk endpoint: {str(e)}")
-        import traceback
-        logging.error(traceback.format_exc())
+        logger.exception("Unhandled error in update_user_from_clerk endpoint")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error updating/creating user: {str(e)}"
-        )
+        ) from e
 
 
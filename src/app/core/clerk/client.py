@@ -1,20 +1,357 @@
 """
 Clerk client implementation for FastAPI
 """
-from typing import Dict, Any, Optional, List
+import asyncio
+import base64
+import hashlib
+import logging
+import time
+import weakref
+from types import MappingProxyType
+from functools import lru_cache
+from typing import Dict, Any, Optional
 from pydantic import BaseModel
-from fastapi import Depends, HTTPException
+from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
+from cachetools import TTLCache
 from clerk_backend_api import Clerk
+import httpx
+import orjson
 import jwt
+from jwt import PyJWK
 
 from ...core.config import settings
 
+logger = logging.getLogger(__name__)
+
 # Initialize security for JWT Bearer token
 security = HTTPBearer()
 
-# Initialize Clerk client
-clerk = Clerk(bearer_auth=settings.CLERK_SECRET_KEY)
+# Shared Clerk client for async calls, created on first use so its HTTP connection pool
+# is reused across requests instead of being set up per call
+_clerk_async: Optional[Clerk] = None
+_clerk_http: Optional[httpx.AsyncClient] = None
+
+
+def _get_clerk_http() -> httpx.AsyncClient:
+    """Return the process-wide HTTP connection pool used for Clerk API and JWKS calls"""
+    global _clerk_http
+    # No await between the check and the assignment, so concurrent callers can't race here
+    if _clerk_http is None:
+        _clerk_http = httpx.AsyncClient(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            timeout=5.0,
+        )
+    return _clerk_http
+
+
+def get_async_clerk() -> Clerk:
+    """Return the process-wide Clerk client used for async calls"""
+    global _clerk_async
+    if _clerk_async is None:
+        _clerk_async = Clerk(bearer_auth=settings.CLERK_SECRET_KEY, async_client=_get_clerk_http())
+    return _clerk_async
+
+
+async def close_async_clerk() -> None:
+    """Close the shared async Clerk client and its connection pool"""
+    global _clerk_async, _clerk_http
+    # The SDK doesn't close a client it was handed, so close the pool ourselves
+    if _clerk_http is not None:
+        await _clerk_http.aclose()
+    _clerk_async = None
+    _clerk_http = None
+
+# JWKS configuration
+# For Clerk, we need to use the instance-specific JWKS URL
+CLERK_ISSUER = getattr(settings, "CLERK_JWT_ISSUER", "https://summary-tarpon-14.clerk.accounts.dev")
+CLERK_AUDIENCE = getattr(settings, "CLERK_AUDIENCE", "http://localhost:3000")  # Frontend URL
+CLERK_JWT_ALGORITHMS = ("RS256",)
+# Clerk session tokens always carry these claims; reject tokens that don't
+CLERK_JWT_REQUIRED_CLAIMS = ("exp", "iat", "sub")
+# jwt.decode options, built once instead of per verification. Clerk session tokens only carry
+# aud when configured to, so the audience is checked only when the claim is present.
+_JWT_DECODE_OPTIONS = MappingProxyType({"require": CLERK_JWT_REQUIRED_CLAIMS, "verify_aud": True})
+_JWT_DECODE_OPTIONS_NO_AUD = MappingProxyType({"require": CLERK_JWT_REQUIRED_CLAIMS, "verify_aud": False})
+
+# Verified token claims keyed by the SHA-256 digest of the raw token (see token_digest), so
+# repeated requests carrying the same token skip the JWKS lookup and RS256 verification.
+_verified_token_cache: TTLCache = TTLCache(
+    maxsize=settings.CLERK_TOKEN_CACHE_MAX_SIZE, ttl=settings.CLERK_TOKEN_CACHE_TTL
+)
+
+# Clerk user profiles keyed by Clerk user ID. Profiles rarely change, and every authenticated
+# request looks one up, so a short TTL takes the Clerk API call off the hot path. The per-user
+# locks make concurrent misses for the same user share a single API call; they are held
+# weakly, so a lock goes away on its own once no caller is waiting on it.
+_clerk_user_cache: TTLCache = TTLCache(
+    maxsize=settings.CLERK_USER_CACHE_MAX_SIZE, ttl=settings.CLERK_USER_CACHE_TTL
+)
+_clerk_user_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+# JWKS cached in memory and revalidated with the endpoint's ETag once it is older than its
+# Cache-Control max-age (JWKS_CACHE_TTL when the response doesn't say). Fetches are
+# single-flight: concurrent callers wait on the lock and reuse the fetched result.
+JWKS_CACHE_TTL = 300
+# After a failed refresh, keep serving the cached JWKS this long before trying again
+JWKS_ERROR_RETRY_INTERVAL = 30
+_jwks: Optional[Dict[str, Any]] = None
+_jwks_etag: Optional[str] = None
+_jwks_expires_at = 0.0
+_jwks_checked_at = 0.0
+_jwks_lock = asyncio.Lock()
+# Keys from the JWKS in use before the last rotation, still accepted for this many seconds so
+# tokens signed just before Clerk rotated its keys keep verifying
+JWKS_PREVIOUS_KEYS_GRACE = 600
+_previous_jwks_keys: Dict[str, Dict[str, Any]] = {}
+_previous_jwks_expires_at = 0.0
+# The background refresher revalidates the JWKS this many seconds before it expires, so
+# requests keep hitting the in-memory copy instead of waiting on a refetch
+JWKS_REFRESH_AHEAD = 30
+_jwks_refresher_task: Optional[asyncio.Task] = None
+
+def _parse_max_age(cache_control: Optional[str]) -> Optional[int]:
+    """Return the max-age directive of a Cache-Control header, if present"""
+    for directive in (cache_control or "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name.lower() == "max-age" and value.isdigit():
+            return int(value)
+    return None
+
+async def get_jwks(force_refresh: bool = False) -> Dict[str, Any]:
+    """Fetch and cache the JWKS from Clerk
+    
+    The JWKS is fetched over the shared async HTTP pool, so a refresh never blocks the
+    event loop. If a refresh fails while an older JWKS is cached, the old one keeps being served.
+    
+    Args:
+        force_refresh: Revalidate even if the cached JWKS hasn't expired yet
+    
+    Returns:
+        Dict[str, Any]: The JWKS response as a dictionary
+        
+    Raises:
+        HTTPException: If the JWKS endpoint returns an error and nothing is cached
+    """
+    global _jwks, _jwks_etag, _jwks_expires_at, _jwks_checked_at, _previous_jwks_keys, _previous_jwks_expires_at
+    if _jwks is not None and not force_refresh and time.monotonic() < _jwks_expires_at:
+        return _jwks
+
+    requested_at = time.monotonic()
+    async with _jwks_lock:
+        # Another caller may have refreshed the JWKS while we waited for the lock
+        if _jwks is not None and _jwks_checked_at >= requested_at:
+            return _jwks
+        if _jwks is not None and not force_refresh and time.monotonic() < _jwks_expires_at:
+            return _jwks
+
+        # Use the instance-specific JWKS URL based on the issuer
+        jwks_url = f"{CLERK_ISSUER}/.well-known/jwks.json"
+        headers = {"If-None-Match": _jwks_etag} if _jwks is not None and _jwks_etag else {}
+        try:
+            logger.info("Fetching JWKS from %s", jwks_url)
+            response = await _get_clerk_http().get(jwks_url, headers=headers)
+            if response.status_code != httpx.codes.NOT_MODIFIED:
+                response.raise_for_status()  # Raise exception for 4XX/5XX responses
+                new_jwks = orjson.loads(response.content)
+                if _jwks is not None and new_jwks != _jwks:
+                    _previous_jwks_keys = {key["kid"]: key for key in _jwks["keys"]}
+                    _previous_jwks_expires_at = time.monotonic() + JWKS_PREVIOUS_KEYS_GRACE
+                _jwks = new_jwks
+                _jwks_etag = response.headers.get("ETag")
+                # Keys may have been rotated, so drop the key objects built from the old set
+                get_public_key.cache_clear()
+            max_age = _parse_max_age(response.headers.get("Cache-Control"))
+            _jwks_checked_at = time.monotonic()
+            _jwks_expires_at = _jwks_checked_at + (max_age if max_age is not None else JWKS_CACHE_TTL)
+            return _jwks
+        except (httpx.HTTPError, orjson.JSONDecodeError) as e:
+            if _jwks is not None:
+                logger.warning("Failed to refresh JWKS, keeping the cached keys: %s", e)
+                _jwks_expires_at = time.monotonic() + JWKS_ERROR_RETRY_INTERVAL
+                return _jwks
+            if isinstance(e, httpx.TimeoutException):
+                logger.error("Timeout while fetching JWKS from %s", jwks_url)
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Authentication service is temporarily unavailable"
+                )
+            if isinstance(e, orjson.JSONDecodeError):  # JSON parsing error
+                logger.error("Invalid JWKS response: %s", e)
+                raise HTTPException(
+                    status_code=status.HTTP_502_BAD_GATEWAY,
+                    detail="Invalid response from authentication service"
+                )
+            logger.error("Failed to fetch JWKS: %s", e)
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Failed to connect to authentication service: {str(e)}"
+            )
+
+def _decode_segment(segment: str) -> Dict[str, Any]:
+    """Decode a base64url-encoded JWT segment with orjson
+    
+    Raises jwt.DecodeError unless the segment is a JSON object, so a crafted header or
+    payload such as a list is rejected as an invalid token rather than failing later.
+    """
+    decoded = orjson.loads(base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4)))
+    if not isinstance(decoded, dict):
+        raise jwt.DecodeError("Invalid token segment: expected a JSON object")
+    return decoded
+
+def get_jwk_kid(token: str) -> str:
+    """Extract the key ID from the JWT header"""
+    header, _ = token.split(".", 1)
+    return _decode_segment(header)["kid"]
+
+@lru_cache(maxsize=500)
+def get_public_key(kid: str) -> PyJWK:
+    """Get the public key for the given key ID from the currently cached JWKS
+    
+    The JWK is constructed into a key object once per key ID and cached, so jwt.decode
+    doesn't have to parse key material on every call. The cache is cleared whenever a
+    new JWKS is fetched. Lookups for unknown key IDs raise and are therefore never cached.
+    """
+    jwks = _jwks or {"keys": []}
+    for key_dict in jwks["keys"]:
+        if key_dict["kid"] == kid:
+            return PyJWK(key_dict, algorithm=CLERK_JWT_ALGORITHMS[0])
+    raise LookupError(f"Public key not found for kid: {kid}")
+
+def _get_previous_public_key(kid: str) -> PyJWK:
+    """Get the public key for a key ID from the JWKS replaced by the last rotation, within its grace period"""
+    key_dict = _previous_jwks_keys.get(kid)
+    if key_dict is None or time.monotonic() >= _previous_jwks_expires_at:
+        raise LookupError(f"Public key not found for kid: {kid}")
+    return PyJWK(key_dict, algorithm=CLERK_JWT_ALGORITHMS[0])
+
+# Minimum number of seconds between JWKS refetches triggered by unknown key IDs, so tokens
+# with made-up kids can't turn every request into a call to the JWKS endpoint
+JWKS_REFRESH_MIN_INTERVAL = 1
+_jwks_refreshed_at = 0.0
+
+async def get_public_key_with_refresh(kid: str) -> PyJWK:
+    """Get the public key for a key ID, refetching the JWKS once if the kid is unknown
+    
+    Clerk may have rotated its signing keys since the JWKS was cached; a miss revalidates
+    the cached JWKS (at most once per JWKS_REFRESH_MIN_INTERVAL) and retries the lookup.
+    Keys dropped by a rotation in the last JWKS_PREVIOUS_KEYS_GRACE seconds are still accepted.
+    """
+    global _jwks_refreshed_at
+    await get_jwks()
+    try:
+        return get_public_key(kid)
+    except LookupError:
+        pass
+    try:
+        return _get_previous_public_key(kid)
+    except LookupError:
+        now = time.monotonic()
+        if now - _jwks_refreshed_at < JWKS_REFRESH_MIN_INTERVAL:
+            raise
+        _jwks_refreshed_at = now
+        logger.info("Unknown JWT kid %s, refreshing JWKS", kid)
+        await get_jwks(force_refresh=True)
+        return get_public_key(kid)
+
+async def _refresh_jwks_periodically() -> None:
+    """Keep the cached JWKS fresh in the background until cancelled"""
+    while True:
+        try:
+            # The first pass warms the cache; later passes revalidate it ahead of expiry
+            await get_jwks(force_refresh=_jwks is not None)
+        except Exception as e:  # Requests fall back to fetching on demand
+            logger.warning("Background JWKS refresh failed: %s", e)
+        delay = _jwks_expires_at - time.monotonic() - JWKS_REFRESH_AHEAD
+        await asyncio.sleep(max(delay, JWKS_REFRESH_AHEAD))
+
+def start_jwks_refresher() -> None:
+    """Start the background JWKS refresher, called from the application lifespan"""
+    global _jwks_refresher_task
+    if _jwks_refresher_task is None or _jwks_refresher_task.done():
+        _jwks_refresher_task = asyncio.create_task(_refresh_jwks_periodically())
+
+async def stop_jwks_refresher() -> None:
+    """Cancel the background JWKS refresher and wait for it to finish"""
+    global _jwks_refresher_task
+    if _jwks_refresher_task is not None:
+        _jwks_refresher_task.cancel()
+        try:
+            await _jwks_refresher_task
+        except asyncio.CancelledError:
+            pass
+    _jwks_refresher_task = None
+
+def _get_cached_claims(cache_key: bytes) -> Optional[Dict[str, Any]]:
+    """Return cached claims for a token digest if they are still within their validity window"""
+    payload = _verified_token_cache.get(cache_key)
+    if payload is None:
+        return None
+
+    # The cache TTL is independent of the token lifetime, so re-check the time claims
+    now = time.time()
+    if payload.get("exp", now) <= now or payload.get("nbf", now) > now:
+        _verified_token_cache.pop(cache_key, None)
+        return None
+    return payload
+
+def _unverified_claims(token: str) -> Dict[str, Any]:
+    """Decode the JWT payload segment without any verification; only for cheap pre-checks"""
+    _, body, _ = token.split(".", 2)
+    return _decode_segment(body)
+
+def token_digest(token: str) -> bytes:
+    """Return the digest that token caches are keyed by, so the raw token is never kept in memory
+    
+    hashlib.sha256 is backed by OpenSSL, which uses the CPU's SHA extensions where available.
+    A non-cryptographic hash would be faster but would let a crafted token collide with a
+    cached one, so it isn't an option for an authentication cache.
+    """
+    return hashlib.sha256(token.encode()).digest()
+
+async def verify_clerk_token(token: str, cache_key: Optional[bytes] = None) -> Dict[str, Any]:
+    """Verify a Clerk JWT token using JWKS
+    
+    Successfully verified claims are cached for a short TTL, keyed by token_digest(token),
+    which callers that already computed it can pass as cache_key. The cache is only
+    touched synchronously on the event loop, so it needs no lock.
+    """
+    if cache_key is None:
+        cache_key = token_digest(token)
+    payload = _get_cached_claims(cache_key)
+    if payload is not None:
+        return payload
+
+    try:
+        # Reject expired tokens from the unverified claims before paying for the key lookup
+        # and RS256 verification; the full decode below still enforces exp for everything else
+        unverified_claims = _unverified_claims(token)
+        exp = unverified_claims.get("exp")
+        if isinstance(exp, (int, float)) and exp <= time.time():
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
+
+        kid = get_jwk_kid(token)
+        public_key = await get_public_key_with_refresh(kid)
+        # RS256 verification is CPU-bound; run it in the threadpool so cache misses don't
+        # stall other requests on the event loop
+        payload = await run_in_threadpool(
+            jwt.decode,
+            token,
+            public_key.key,
+            algorithms=CLERK_JWT_ALGORITHMS,
+            audience=CLERK_AUDIENCE,
+            issuer=CLERK_ISSUER,
+            options=_JWT_DECODE_OPTIONS if "aud" in unverified_claims else _JWT_DECODE_OPTIONS_NO_AUD
+        )
+        _verified_token_cache[cache_key] = payload
+        return payload
+    except jwt.ExpiredSignatureError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
+    except (jwt.PyJWTError, ValueError, LookupError):
+        # Malformed segments fail our own header/claims parsing with ValueError (including
+        # base64 and JSON errors), and a missing or unknown kid with LookupError
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
 
 class UserEmailAddress(BaseModel):
@@ -37,27 +374,11 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     """
     Verify the Clerk JWT token and return the user ID
     """
-    token = credentials.credentials
-    try:
-        # Decode the JWT token without verification to extract the user ID
-        # This is a simplified approach for development
-        payload = jwt.decode(token, options={"verify_signature": False}, algorithms=["RS256"])
-        
-        # Get the user ID from the token
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token: User ID not found")
-        
-        # Get the session ID from the token
-        session_id = payload.get("sid")
-        
-        # For production, you should verify the token with Clerk
-        # if session_id:
-        #     clerk.sessions.verify(session_id=session_id, token=token)
-        
-        return {"user_id": user_id, "session_claims": payload}
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+    # Signature and claims are verified against the Clerk JWKS; repeat tokens are served from the claims cache
+    payload = await verify_clerk_token(credentials.credentials)
+    
+    # The decode requires the sub claim, so the user ID is always present
+    return {"user_id": payload["sub"], "session_claims": payload}
 
 
 async def get_current_user_info(auth: Dict[str, Any] = Depends(get_current_user)) -> UserResponse:
@@ -65,65 +386,39 @@ async def get_current_user_info(auth: Dict[str, Any] = Depends(get_current_user)
     Get the current user's information from Clerk
     This endpoint is protected and requires authentication
     """
-    user_id = auth["user_id"]
-    
-    try:
-        # Fetch user data using the Clerk SDK
-        user = clerk.users.get(user_id=user_id)
-        
-        # Extract email safely
-        email = _extract_primary_email(user)
-        
-        return UserResponse(
-            clerk_id=user.id,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            email=email,
-            profile_image_url=user.profile_image_url
-        )
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"User not found: {str(e)}")
+    return await get_user_by_id_async(auth["user_id"])
 
 
 def _extract_primary_email(user) -> Optional[str]:
     """
     Safely extract the primary email from a user object
+    
+    Makes a single pass over the addresses, returning the primary one as soon as it is seen
+    and otherwise the first usable address. Entries may be SDK objects, dicts or plain strings.
     """
-    try:
-        if not hasattr(user, 'email_addresses') or not user.email_addresses:
-            return None
-            
-        # Handle different types of email_addresses response
-        if isinstance(user.email_addresses, list):
-            # Try to find primary email first
-            for email in user.email_addresses:
-                if hasattr(email, 'primary') and email.primary:
-                    return email.email_address
-                
-            # If no primary email is found, return the first one
-            if user.email_addresses:
-                if hasattr(user.email_addresses[0], 'email_address'):
-                    return user.email_addresses[0].email_address
-                elif isinstance(user.email_addresses[0], dict):
-                    return user.email_addresses[0].get('email_address')
-                elif isinstance(user.email_addresses[0], str):
-                    return user.email_addresses[0]
-                
-        # Handle case where email_addresses is a dictionary
-        elif isinstance(user.email_addresses, dict):
-            primary = user.email_addresses.get('primary')
-            if primary:
-                return primary
-            
-            # Get first email if available
-            emails = user.email_addresses.get('emails', [])
-            if emails and len(emails) > 0:
-                return emails[0]
-                
-        return None
-    except Exception:
-        # In case of any error, return None
+    email_addresses = getattr(user, "email_addresses", None)
+    if not email_addresses:
         return None
+    
+    # Handle case where email_addresses is a dictionary
+    if isinstance(email_addresses, dict):
+        return email_addresses.get("primary") or next(iter(email_addresses.get("emails") or ()), None)
+    
+    first = None
+    for email in email_addresses:
+        if isinstance(email, str):
+            address, primary = email, False
+        elif isinstance(email, dict):
+            address, primary = email.get("email_address"), email.get("primary", False)
+        else:
+            address, primary = getattr(email, "email_address", None), getattr(email, "primary", False)
+        if address is None:
+            continue
+        if primary:
+            return address
+        if first is None:
+            first = address
+    return first
 
 
 async def get_session_info(auth: Dict[str, Any] = Depends(get_current_user)) -> Dict[str, Any]:
@@ -143,8 +438,8 @@ async def get_session_info(auth: Dict[str, Any] = Depends(get_current_user)) ->
         }
     
     try:
-        # Get session details from Clerk
-        session = clerk.sessions.get(session_id=session_id)
+        # Get session details from Clerk without blocking the event loop
+        session = await get_async_clerk().sessions.get_async(session_id=session_id)
         
         return {
             "user_id": session_claims.get("sub"),
@@ -171,40 +466,14 @@ async def verify_token(token: str) -> Dict[str, Any]:
     """
     Verify a Clerk JWT token and return the claims
     """
-    try:
-        # Decode the JWT token without verification for development
-        payload = jwt.decode(token, options={"verify_signature": False}, algorithms=["RS256"])
-        
-        # For production, you should verify the token with Clerk
-        # session_id = payload.get("sid")
-        # if session_id:
-        #     clerk.sessions.verify(session_id=session_id, token=token)
-        
-        return payload
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+    return await verify_clerk_token(token)
 
 
 async def get_user_by_id(user_id: str) -> UserResponse:
     """
     Get a user by their Clerk ID
     """
-    try:
-        # Fetch user data using the Clerk SDK
-        user = clerk.users.get(user_id=user_id)
-        
-        # Extract email safely
-        email = _extract_primary_email(user)
-        
-        return UserResponse(
-            clerk_id=user.id,
-            first_name=user.first_name,
-            last_name=user.last_name,
-            email=email,
-            profile_image_url=user.profile_image_url
-        )
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"User not found: {str(e)}")
+    return await get_user_by_id_async(user_id)
 
 
 # Async versions of the functions
@@ -212,48 +481,51 @@ async def get_current_user_async(credentials: HTTPAuthorizationCredentials = Dep
     """
     Async version: Verify the Clerk JWT token and return the user ID
     """
-    token = credentials.credentials
-    try:
-        # Decode the JWT token without verification to extract the user ID
-        payload = jwt.decode(token, options={"verify_signature": False}, algorithms=["RS256"])
-        
-        # Get the user ID from the token
-        user_id = payload.get("sub")
-        if not user_id:
-            raise HTTPException(status_code=401, detail="Invalid token: User ID not found")
-        
-        # Get the session ID from the token
-        session_id = payload.get("sid")
-        
-        # For production, you should verify the token with Clerk
-        # if session_id:
-        #     async with Clerk(bearer_auth=settings.CLERK_SECRET_KEY) as clerk_async:
-        #         await clerk_async.sessions.verify_async(session_id=session_id, token=token)
-        
-        return {"user_id": user_id, "session_claims": payload}
-    except Exception as e:
-        raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+    return await get_current_user(credentials)
 
 
 async def get_user_by_id_async(user_id: str) -> UserResponse:
     """
     Async version: Get a user by their Clerk ID
+    
+    Results are cached for CLERK_USER_CACHE_TTL seconds; failed lookups are not cached.
     """
-    try:
-        # For async operations, we need to use async with
-        async with Clerk(bearer_auth=settings.CLERK_SECRET_KEY) as clerk_async:
-            # Fetch user data using the Clerk SDK
-            user = await clerk_async.users.get_async(user_id=user_id)
+    cached = _clerk_user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    
+    lock = _clerk_user_locks.get(user_id)
+    if lock is None:
+        lock = _clerk_user_locks[user_id] = asyncio.Lock()
+    async with lock:
+        # Another request may have filled the cache while we were waiting
+        cached = _clerk_user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        
+        try:
+            # Fetch user data using the shared async Clerk client
+            user = await get_async_clerk().users.get_async(user_id=user_id)
             
             # Extract email safely
             email = _extract_primary_email(user)
             
-            return UserResponse(
+            user_response = UserResponse(
                 clerk_id=user.id,
                 first_name=user.first_name,
                 last_name=user.last_name,
                 email=email,
                 profile_image_url=user.profile_image_url
             )
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"User not found: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=404, detail=f"User not found: {str(e)}")
+        
+        _clerk_user_cache[user_id] = user_response
+        return user_response
+
+
+def invalidate_cached_clerk_user(user_id: str) -> None:
+    """
+    Drop a Clerk user profile from the cache so the next lookup goes to the Clerk API.
+    """
+    _clerk_user_cache.pop(user_id, None)
@@ -29,10 +29,17 @@ class CryptSettings(BaseSettings):
 
 class ClerkSettings(BaseSettings):
     CLERK_SECRET_KEY: str = config("CLERK_SECRET_KEY", default="")
+    # Build the user from the verified session token when it carries the profile claims
+    # (via a Clerk session token template), instead of fetching it from the Clerk API
+    CLERK_TRUST_JWT_CLAIMS: bool = config("CLERK_TRUST_JWT_CLAIMS", cast=bool, default=True)
 
 
 class DatabaseSettings(BaseSettings):
-    pass
+    DB_POOL_SIZE: int = config("DB_POOL_SIZE", cast=int, default=20)
+    DB_MAX_OVERFLOW: int = config("DB_MAX_OVERFLOW", cast=int, default=10)
+    # Fail fast when the pool is exhausted rather than holding the request for half a minute
+    DB_POOL_TIMEOUT: int = config("DB_POOL_TIMEOUT", cast=int, default=10)
+    DB_POOL_RECYCLE: int = config("DB_POOL_RECYCLE", cast=int, default=1800)
 
 
 class SQLiteSettings(DatabaseSettings):
@@ -50,6 +57,12 @@ class PostgresSettings(DatabaseSettings):
     POSTGRES_SYNC_PREFIX: str = config("POSTGRES_SYNC_PREFIX", default="postgresql://")
     POSTGRES_ASYNC_PREFIX: str = config("POSTGRES_ASYNC_PREFIX", default="postgresql+asyncpg://")
     POSTGRES_URL: str | None = config("POSTGRES_URL", default=None)
+    # Optional read replica, in the same user:password@host:port/db form as POSTGRES_URI
+    POSTGRES_READ_URI: str | None = config("POSTGRES_READ_URI", default=None)
+    # Transaction-mode poolers (PgBouncer, Supabase) can't use asyncpg's prepared statement cache
+    DB_USE_PGBOUNCER: bool = config("DB_USE_PGBOUNCER", cast=bool, default=True)
+    # CA bundle for providers whose server certificate isn't signed by a public CA (e.g. Supabase)
+    POSTGRES_SSL_CA_FILE: str | None = config("POSTGRES_SSL_CA_FILE", default=None)
     
     @property
     def POSTGRES_URI(self) -> str:
@@ -77,6 +90,21 @@ class RedisCacheSettings(BaseSettings):
     REDIS_CACHE_URL: str = f"redis://{REDIS_CACHE_HOST}:{REDIS_CACHE_PORT}"
 
 
+class LocalCacheSettings(BaseSettings):
+    CLERK_TOKEN_CACHE_TTL: int = config("CLERK_TOKEN_CACHE_TTL", default=30)
+    CLERK_TOKEN_CACHE_MAX_SIZE: int = config("CLERK_TOKEN_CACHE_MAX_SIZE", default=10_000)
+    AUTH_SESSION_CACHE_TTL: int = config("AUTH_SESSION_CACHE_TTL", default=5)
+    AUTH_SESSION_CACHE_MAX_SIZE: int = config("AUTH_SESSION_CACHE_MAX_SIZE", default=10_000)
+    CLERK_USER_CACHE_TTL: int = config("CLERK_USER_CACHE_TTL", default=60)
+    CLERK_USER_CACHE_MAX_SIZE: int = config("CLERK_USER_CACHE_MAX_SIZE", default=5_000)
+    USER_CACHE_TTL: int = config("USER_CACHE_TTL", default=600)
+    USER_CACHE_MAX_SIZE: int = config("USER_CACHE_MAX_SIZE", default=50_000)
+    CLERK_IDENTITY_CACHE_TTL: int = config("CLERK_IDENTITY_CACHE_TTL", default=60)
+    CLERK_IDENTITY_CACHE_MAX_SIZE: int = config("CLERK_IDENTITY_CACHE_MAX_SIZE", default=50_000)
+    ORGANIZATION_CACHE_TTL: int = config("ORGANIZATION_CACHE_TTL", default=60)
+    ORGANIZATION_CACHE_MAX_SIZE: int = config("ORGANIZATION_CACHE_MAX_SIZE", default=10_000)
+
+
 class ClientSideCacheSettings(BaseSettings):
     CLIENT_CACHE_MAX_AGE: int = config("CLIENT_CACHE_MAX_AGE", default=60)
 
@@ -134,6 +162,7 @@ class Settings(
     # FirstUserSettings,
     # TestSettings,
     RedisCacheSettings,
+    LocalCacheSettings,
     ClientSideCacheSettings,
     # RedisQueueSettings,
     # RedisRateLimiterSettings,
@@ -1,15 +1,19 @@
-from sqlalchemy.ext.asyncio import create_async_engine
-from sqlalchemy.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
+from collections.abc import AsyncIterator
+
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 import ssl
 import asyncpg
 
-from ..config import settings, DBOption
+from ..config import settings, DBOption, EnvironmentOption
 
-# Create an SSL context that doesn't verify certificates for development
-ssl_context = ssl.create_default_context()
-ssl_context.check_hostname = False
-ssl_context.verify_mode = ssl.CERT_NONE
+# One SSL context is shared by the engine and get_pgbouncer_connection so TLS sessions can be resumed.
+# Production verifies the server certificate; other environments skip verification, and with it
+# loading the CA bundle at import.
+if settings.ENVIRONMENT == EnvironmentOption.PRODUCTION:
+    ssl_context = ssl.create_default_context(cafile=getattr(settings, "POSTGRES_SSL_CA_FILE", None))
+else:
+    ssl_context = ssl._create_unverified_context()
 
 if settings.DB_ENGINE == DBOption.SQLITE:
     DATABASE_URI = settings.SQLITE_URI
@@ -20,39 +24,74 @@ if settings.DB_ENGINE == DBOption.POSTGRES:
     DATABASE_URI = settings.POSTGRES_URI
     DATABASE_PREFIX = settings.POSTGRES_ASYNC_PREFIX
     DATABASE_URL = f"{DATABASE_PREFIX}{DATABASE_URI}"
-    # Configure connect_args for PostgreSQL with PgBouncer compatibility
-    connect_args = {
-        "ssl": ssl_context,
-        "statement_cache_size": 0,
-        "prepared_statement_cache_size": 0,
-        "server_settings": {'statement_cache_mode': 'disable'}
-    }
-
-# Create engine with proper connection arguments and pool settings
-async_engine = create_async_engine(
-    DATABASE_URL, 
-    echo=False, 
-    future=True,
-    connect_args=connect_args,
-    pool_pre_ping=True,  # Check connection validity before using from pool
-    pool_recycle=300,    # Recycle connections after 5 minutes
-    pool_size=5,         # Maintain a pool of connections
-    max_overflow=10      # Allow up to 10 additional connections when pool is full
-)
-
-local_session = sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
-
-
-async def async_get_db() -> AsyncSession:
-    async_session = local_session
-    async with async_session() as db:
+    connect_args = {"ssl": ssl_context}
+    if settings.DB_USE_PGBOUNCER:
+        # PgBouncer compatibility: prepared statements don't survive transaction pooling
+        connect_args.update({
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "server_settings": {'statement_cache_mode': 'disable'}
+        })
+
+
+def _create_engine(url: str) -> AsyncEngine:
+    # Create engine with proper connection arguments and pool settings
+    return create_async_engine(
+        url, 
+        echo=False, 
+        future=True,
+        connect_args=connect_args,
+        pool_pre_ping=True,  # Check connection validity before using from pool
+        pool_recycle=settings.DB_POOL_RECYCLE,  # Recycle connections after 30 minutes by default
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+
+
+async_engine = _create_engine(DATABASE_URL)
+
+local_session = async_sessionmaker(async_engine, expire_on_commit=False)
+
+# Read-only endpoints run in autocommit mode, so they skip the BEGIN/COMMIT round trips. They go to
+# the read replica when one is configured, otherwise they share the primary's pool.
+if settings.DB_ENGINE == DBOption.POSTGRES and settings.POSTGRES_READ_URI:
+    read_engine_base = _create_engine(f"{DATABASE_PREFIX}{settings.POSTGRES_READ_URI}")
+else:
+    read_engine_base = async_engine
+async_read_engine = read_engine_base.execution_options(isolation_level="AUTOCOMMIT")
+
+local_read_session = async_sessionmaker(async_read_engine, expire_on_commit=False)
+
+
+async def async_get_db(request: Request) -> AsyncIterator[AsyncSession]:
+    # Reuse the session the auth middleware opened for this request; the middleware closes it
+    db = getattr(request.state, "db", None)
+    if db is not None:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+        return
+    # The context manager closes the session on exit
+    async with local_session() as db:
         try:
             yield db
-        except Exception as e:
+        except Exception:
             await db.rollback()
-            raise e
-        finally:
-            await db.close()
+            raise
+
+
+async def async_get_db_read(request: Request) -> AsyncIterator[AsyncSession]:
+    # Authenticated requests already hold the middleware's session; reuse it rather than
+    # checking out a second connection for the same request
+    db = getattr(request.state, "db", None)
+    if db is not None:
+        yield db
+        return
+    async with local_read_session() as db:
+        yield db
 
 
 # Direct connection function for PgBouncer compatibility
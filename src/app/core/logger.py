@@ -1,6 +1,7 @@
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener
 
 LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "logs")
 if not os.path.exists(LOG_DIR):
@@ -10,11 +11,33 @@ LOG_FILE_PATH = os.path.join(LOG_DIR, "app.log")
 
 LOGGING_LEVEL = logging.INFO
 LOGGING_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+# Records waiting for the background log writer; beyond this, new records are dropped
+LOG_QUEUE_MAX_SIZE = 10_000
 
-logging.basicConfig(level=LOGGING_LEVEL, format=LOGGING_FORMAT)
 
-file_handler = RotatingFileHandler(LOG_FILE_PATH, maxBytes=10485760, backupCount=5)
-file_handler.setLevel(LOGGING_LEVEL)
-file_handler.setFormatter(logging.Formatter(LOGGING_FORMAT))
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking or erroring"""
 
-logging.getLogger("").addHandler(file_handler)
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            pass
+
+
+def start_queue_logging() -> QueueListener:
+    """
+    Move the root logger's handlers behind a bounded queue drained by a background thread,
+    so request handlers don't block on writing records out. QueueHandler.prepare still
+    formats each record in the calling thread; only the handlers' I/O moves off it.
+    The caller is responsible for stopping the returned listener at shutdown.
+    """
+    root = logging.getLogger()
+    handlers = list(root.handlers)
+    log_queue: queue.Queue = queue.Queue(maxsize=LOG_QUEUE_MAX_SIZE)
+    for handler in handlers:
+        root.removeHandler(handler)
+    root.addHandler(DroppingQueueHandler(log_queue))
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    return listener
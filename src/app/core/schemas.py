@@ -11,13 +11,18 @@ class HealthCheck(BaseModel):
     description: str
 
 
+def utcnow_naive() -> datetime:
+    """Current UTC time without tzinfo, matching the naive timestamp columns."""
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
 # -------------- mixins --------------
 class UUIDSchema(BaseModel):
     uuid: uuid_pkg.UUID = Field(default_factory=uuid_pkg.uuid4)
 
 
 class TimestampSchema(BaseModel):
-    created_at: datetime = Field(default_factory=lambda: datetime.now(UTC).replace(tzinfo=None))
+    created_at: datetime = Field(default_factory=utcnow_naive)
     updated_at: datetime = Field(default=None)
 
     @field_serializer("created_at")
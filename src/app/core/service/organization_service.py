@@ -1,18 +1,125 @@
-from typing import List, Optional
+import logging
+from datetime import datetime
+from typing import List, Optional, Tuple
+from cachetools import TTLCache
+from pydantic import TypeAdapter
+from sqlalchemy import inspect, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlmodel import select
+from starlette.concurrency import run_in_threadpool
 
 from ...crud.crud_organizations import crud_organizations
-from ...crud.crud_users import crud_users
-from ...models.organization import Organization, OrganizationCreate, OrganizationRead, OrganizationUpdate, OrganizationUpdateInternal
+from ...models.organization import Organization, OrganizationCreate, OrganizationRead, OrganizationUpdate
 from ...models.user import User, UserRead, UserUpdate
+from ...core.config import settings
+from .user_service import get_current_db_user, invalidate_shared_user, resolve_clerk_identity
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
 
+logger = logging.getLogger(__name__)
+
+# Per-process cache of organizations keyed by organization id, so every member of an
+# organization shares one entry and an update only has to drop that one key.
+_organization_cache: TTLCache = TTLCache(
+    maxsize=settings.ORGANIZATION_CACHE_MAX_SIZE, ttl=settings.ORGANIZATION_CACHE_TTL
+)
+
+# Built once so listing validates the whole batch in pydantic-core instead of one model_validate per row
+_user_list_adapter = TypeAdapter(List[UserRead])
+# Member lists at least this long are validated off the event loop; below it the thread hop costs more than it saves
+_THREADPOOL_VALIDATION_THRESHOLD = 500
+# Only the columns UserRead exposes, so listing skips building full User entities
+_user_read_columns = tuple(getattr(User, field) for field in UserRead.model_fields)
+
+
+async def _load_user_and_org(db: AsyncSession, criterion) -> Tuple[Optional[User], Optional[Organization]]:
+    """
+    Load a user and their organization in a single round trip, used when the caller has no db_user at hand.
+
+    Args:
+        db: Database session
+        criterion: Filter selecting the user, e.g. ``User.clerk_id == clerk_id``
+
+    Returns:
+        A ``(user, organization)`` tuple; either side is None when no row exists
+    """
+    stmt = (
+        select(User, Organization)
+        .outerjoin(Organization, User.organization_id == Organization.id)
+        .where(criterion)
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    return (row[0], row[1]) if row else (None, None)
+
+
+async def _resolve_organization_id(db: AsyncSession, clerk_id: str, db_user: Optional[User]) -> str:
+    """
+    Return the organization id of the user, going through the cached Clerk identity
+    instead of loading the whole user row when the caller has no db_user at hand.
+    
+    Raises:
+        NotFoundException: If the user is not found or doesn't have an organization
+    """
+    if db_user is None:
+        db_user = get_current_db_user(clerk_id=clerk_id)
+    if db_user is None:
+        identity = await resolve_clerk_identity(db, clerk_id)
+        if identity is None:
+            raise NotFoundException("User not found")
+        organization_id = identity.organization_id
+    else:
+        organization_id = db_user.organization_id
+    
+    # Check if the user has an organization
+    if not organization_id:
+        raise NotFoundException("User does not have an organization")
+    return organization_id
+
+
+def _loaded_organization(db: AsyncSession, db_user: User) -> Optional[Organization]:
+    """
+    Return the organization eagerly loaded with the user, or None if it was never loaded.
+
+    The auth middleware loads db_user with joinedload(User.organization) in the request's
+    session, so the organization is usually already at hand; reading an unloaded relationship
+    would lazy-load, which an AsyncSession can't do implicitly. A user from any other session
+    (or none) may carry an organization loaded long ago, so it is never trusted.
+    """
+    state = inspect(db_user)
+    if state.session is not db.sync_session or "organization" in state.unloaded:
+        return None
+    return db_user.organization
+
+
+async def _get_organization(db: AsyncSession, organization_id: str, db_user: Optional[User]) -> OrganizationRead:
+    """
+    Return an organization by id from the cache, the organization loaded with db_user, or the database.
+    
+    Raises:
+        NotFoundException: If the organization doesn't exist
+    """
+    organization = _organization_cache.get(organization_id)
+    if organization is not None:
+        return organization
+    
+    # Get the organization details, unless it was loaded together with the user
+    organization = _loaded_organization(db, db_user) if db_user is not None else None
+    if organization is None:
+        organization = await crud_organizations.get(db=db, schema_to_select=OrganizationRead, id=organization_id)
+    if not organization:
+        raise NotFoundException("Organization not found")
+    
+    organization = OrganizationRead.model_validate(organization)
+    _organization_cache[organization_id] = organization
+    return organization
+
 
 async def create_organization(
     db: AsyncSession,
     id: str,
-    organization_data: OrganizationCreate
+    organization_data: OrganizationCreate,
+    db_user: Optional[User] = None
 ) -> OrganizationRead:
     """
     Create a new organization and associate it with the user.
@@ -21,6 +128,7 @@ async def create_organization(
         db: Database session
         user_id: ID of the user creating the organization
         organization_data: Organization data to create
+        db_user: The already loaded user (e.g. from the auth middleware), skips the user lookup
         
     Returns:
         The created organization
@@ -30,33 +138,27 @@ async def create_organization(
         NotFoundException: If the user is not found
     """
     # Get the user from the database by uuid using direct query
-    import logging
-    from sqlmodel import select as sqlmodel_select
-    from ...models.user import User
-    
-    logging.info(f"Looking for user with uuid: {id}")
-    stmt = sqlmodel_select(User).where(User.id == id).limit(1)
-    result = await db.execute(stmt)
-    db_user_tuple = result.first()
-    
-    if not db_user_tuple:
-        raise NotFoundException("User not found")
-        
-    # Extract the user from the tuple
-    db_user = db_user_tuple[0]
+    existing_org = None
+    if db_user is None:
+        db_user = get_current_db_user(uuid=id)
+    if db_user is None:
+        logger.debug("Looking for user with uuid: %s", id)
+        db_user, existing_org = await _load_user_and_org(db, User.id == id)
+        if not db_user:
+            raise NotFoundException("User not found")
+    elif db_user.organization_id:
+        existing_org = _loaded_organization(db, db_user)
+    existing_org_name = existing_org.name if existing_org else None
+    if db_user.organization_id and existing_org is None:
+        # Only the name is needed for the error, so skip hydrating the organization
+        org_stmt = select(Organization.name).where(Organization.id == db_user.organization_id).limit(1)
+        existing_org_name = await db.scalar(org_stmt)
     
     # Check if the user already has an organization
-    if db_user.organization_id:
-        # Get the organization details using direct query
-        org_stmt = sqlmodel_select(Organization).where(Organization.id == db_user.organization_id).limit(1)
-        org_result = await db.execute(org_stmt)
-        org_tuple = org_result.first()
-        
-        if org_tuple:
-            existing_org = org_tuple[0]
-            raise DuplicateValueException(
-                f"User is already associated to an organization: {existing_org.name}"
-            )
+    if existing_org_name:
+        raise DuplicateValueException(
+            f"User is already associated to an organization: {existing_org_name}"
+        )
     
     # Create the organization
     new_organization = await crud_organizations.create(
@@ -64,24 +166,27 @@ async def create_organization(
         object=organization_data
     )
     
-    # Associate the user with the organization directly
-    # Update the user's organization_id and set role to admin
-    db_user.organization_id = new_organization.id
-    db_user.role = "admin"  # Make the organization creator an admin
+    # Associate the user with the organization directly. db_user may come from outside this
+    # session, so update a session-local copy and leave the caller's instance untouched
+    merged_user = await db.merge(db_user)
+    merged_user.organization_id = new_organization.id
+    merged_user.role = "admin"  # Make the organization creator an admin
     
     # Commit the changes to the database
-    db.add(db_user)
     await db.commit()
-    await db.refresh(db_user)
+    await db.refresh(merged_user)
+    # The user's organization_id and role changed, so drop any cached copy of the user
+    await invalidate_shared_user(merged_user.clerk_id, uuid=merged_user.id)
     
-    logging.info(f"Updated user {db_user.id} with organization_id {new_organization.id} and role 'admin'")
+    logger.debug("Updated user %s with organization_id %s and role 'admin'", merged_user.id, new_organization.id)
     
     return new_organization
 
 
 async def get_organization_by_user_id(
     db: AsyncSession,
-    user_id: str
+    user_id: str,
+    db_user: Optional[User] = None
 ) -> OrganizationRead:
     """
     Get the organization associated with a user.
@@ -89,6 +194,7 @@ async def get_organization_by_user_id(
     Args:
         db: Database session
         user_id: ID of the user
+        db_user: The already loaded user (e.g. from the auth middleware), skips the user lookup
         
     Returns:
         The organization
@@ -96,30 +202,19 @@ async def get_organization_by_user_id(
     Raises:
         NotFoundException: If the user doesn't have an organization
     """
-    # Get the user from the database by clerk_id
+    # Resolve the user's organization
     # The user_id from clerk_user.id is actually the clerk_id, not the database id
-    import logging
-    logging.info(f"Looking for user with clerk_id: {user_id}")
-    db_user = await crud_users.get(db=db, schema_to_select=None, clerk_id=user_id)
-    if not db_user:
-        raise NotFoundException("User not found")
-    
-    # Check if the user has an organization
-    if not db_user.organization_id:
-        raise NotFoundException("User does not have an organization")
-    
-    # Get the organization details
-    organization = await crud_organizations.get(db=db, schema_to_select=OrganizationRead, id=db_user.organization_id)
-    if not organization:
-        raise NotFoundException("Organization not found")
-    
-    return organization
+    organization_id = await _resolve_organization_id(db, user_id, db_user)
+    if db_user is None:
+        db_user = get_current_db_user(clerk_id=user_id)
+    return await _get_organization(db, organization_id, db_user)
 
 
 async def update_organization(
     db: AsyncSession,
     user_id: str,
-    organization_data: OrganizationUpdate
+    organization_data: OrganizationUpdate,
+    db_user: Optional[User] = None
 ) -> OrganizationRead:
     """
     Update the organization associated with a user.
@@ -128,6 +223,7 @@ async def update_organization(
         db: Database session
         user_id: ID of the user
         organization_data: Organization data to update
+        db_user: The already loaded user (e.g. from the auth middleware), skips the user lookup
         
     Returns:
         The updated organization
@@ -136,49 +232,53 @@ async def update_organization(
         NotFoundException: If the user doesn't have an organization
         DuplicateValueException: If the org_url is already taken
     """
-    # Get the user from the database by clerk_id
+    # Resolve the user's organization
     # The user_id from clerk_user.id is actually the clerk_id, not the database id
-    import logging
-    logging.info(f"Looking for user with clerk_id: {user_id}")
-    db_user = await crud_users.get(db=db, schema_to_select=None, clerk_id=user_id)
-    if not db_user:
-        raise NotFoundException("User not found")
+    organization_id = await _resolve_organization_id(db, user_id, db_user)
     
-    # Check if the user has an organization
-    if not db_user.organization_id:
-        raise NotFoundException("User does not have an organization")
-    
-    # Get the organization
-    db_organization = await crud_organizations.get(db=db, schema_to_select=None, id=db_user.organization_id)
-    if not db_organization:
-        raise NotFoundException("Organization not found")
-    
-    # Update the organization
+    # Nothing to change: serve the organization from the cache or the loaded user without touching the row
     update_data = organization_data.model_dump(exclude_unset=True)
     if not update_data:
-        return await crud_organizations.get(db=db, schema_to_select=OrganizationRead, id=db_user.organization_id)
-    
-    # If org_url is being updated, check if it's already taken by another organization
-    if "org_url" in update_data and update_data["org_url"]:
-        existing_org = await crud_organizations.exists(
-            db=db, 
-            org_url=update_data["org_url"],
-            id__ne=db_user.organization_id  # Exclude current organization from check
+        return await _get_organization(db, organization_id, db_user)
+    
+    # Update the organization in a single statement; when org_url is being changed the
+    # uniqueness check rides along as a NOT EXISTS condition instead of a separate query
+    stmt = (
+        update(Organization)
+        .where(Organization.id == organization_id)
+        .values(**update_data, updated_at=datetime.now())
+        .returning(Organization)
+    )
+    if update_data.get("org_url"):
+        stmt = stmt.where(
+            ~select(Organization.id)
+            .where(
+                Organization.org_url == update_data["org_url"],
+                Organization.id != organization_id  # Exclude current organization from check
+            )
+            .exists()
         )
-        if existing_org:
+    result = await db.execute(stmt)
+    updated_organization = result.scalar_one_or_none()
+    if updated_organization is None:
+        # No row was updated: either the organization is gone or the org_url is taken. There
+        # is nothing to undo, and rolling back would expire the user the auth middleware
+        # loaded into this request's session
+        if update_data.get("org_url") and await crud_organizations.exists(db=db, id=organization_id):
             raise DuplicateValueException(f"Organization URL '{update_data['org_url']}' is already taken")
-        
-    updated_organization = await crud_organizations.update(
-        db=db,
-        db_obj=db_organization,
-        object=OrganizationUpdateInternal(**update_data)
-    )
-    return updated_organization
+        raise NotFoundException("Organization not found")
+    
+    await db.commit()
+    # Replace rather than drop the cached copy, so the next read doesn't have to load it again
+    organization = OrganizationRead.model_validate(updated_organization)
+    _organization_cache[organization_id] = organization
+    return organization
 
 
 async def list_organization_users(
     db: AsyncSession,
-    user_id: str
+    user_id: str,
+    db_user: Optional[User] = None
 ) -> List[UserRead]:
     """
     List all users in the same organization as the specified user.
@@ -186,6 +286,7 @@ async def list_organization_users(
     Args:
         db: Database session
         user_id: ID of the user
+        db_user: The already loaded user (e.g. from the auth middleware), skips the user lookup
         
     Returns:
         List of users in the organization
@@ -193,25 +294,21 @@ async def list_organization_users(
     Raises:
         NotFoundException: If the user doesn't have an organization
     """
-    # Get the user from the database by clerk_id
+    # Resolve the user's organization
     # The user_id from clerk_user.id is actually the clerk_id, not the database id
-    import logging
-    logging.info(f"Looking for user with clerk_id: {user_id}")
-    db_user = await crud_users.get(db=db, schema_to_select=None, clerk_id=user_id)
-    if not db_user:
-        raise NotFoundException("User not found")
-    
-    # Check if the user has an organization
-    if not db_user.organization_id:
-        raise NotFoundException("User does not have an organization")
+    organization_id = await _resolve_organization_id(db, user_id, db_user)
     
-    # Query all users with the same organization_id
-    statement = select(User).where(
-        User.organization_id == db_user.organization_id,
+    # Query all users with the same organization_id in one round trip, selecting only the
+    # UserRead columns as plain rows rather than ORM entities
+    statement = select(*_user_read_columns).where(
+        User.organization_id == organization_id,
         User.is_deleted == False  # Exclude deleted users
     )
     result = await db.execute(statement)
-    users = result.scalars().all()
+    rows = result.mappings().all()
     
-    # Convert to UserRead model
-    return [UserRead.model_validate(user) for user in users]
+    # Convert to UserRead models; large organizations are validated in the threadpool so
+    # the CPU-bound batch doesn't stall other requests on the event loop
+    if len(rows) >= _THREADPOOL_VALIDATION_THRESHOLD:
+        return await run_in_threadpool(_user_list_adapter.validate_python, rows)
+    return _user_list_adapter.validate_python(rows)
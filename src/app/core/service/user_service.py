@@ -1,11 +1,178 @@
-from typing import Any, Dict, Optional
-from datetime import datetime
+import logging
+from contextvars import ContextVar
+from typing import Any, Dict, NamedTuple, Optional
+from cachetools import TTLCache
+import orjson
+from redis.exceptions import RedisError
+from sqlalchemy import lambda_stmt
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from sqlmodel import select
 
 from ...crud.crud_users import crud_users
-from ...models.user import User, UserCreate, UserRead, UserUpdate, UserUpdateInternal
+from ...models.user import User, UserCreate, UserRead, UserUpdate
+from ...core.config import settings
+from ...core.utils import cache as redis_cache
 from ...core.exceptions.http_exceptions import DuplicateValueException, NotFoundException, BadRequestException
 
+logger = logging.getLogger(__name__)
+
+# Per-process read caches for user lookups. Misses are stored as None so repeated
+# lookups for unknown users don't hit the database either.
+_MISSING = object()
+_user_by_uuid_cache: TTLCache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL)
+_user_by_clerk_id_cache: TTLCache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL)
+_clerk_identity_cache: TTLCache = TTLCache(
+    maxsize=settings.CLERK_IDENTITY_CACHE_MAX_SIZE, ttl=settings.CLERK_IDENTITY_CACHE_TTL
+)
+# A UserRead snapshot of the user as last written by create_or_update_user_by_clerk_id, keyed
+# by clerk_id, so a sync carrying unchanged Clerk data can skip writing the row again. Only the
+# immutable snapshot is cached; the User itself is always loaded in the caller's session
+_synced_user_cache: TTLCache = TTLCache(maxsize=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL)
+
+
+# The db_user resolved by the auth middleware for the current request. Each request runs in
+# its own context, so services can reuse it instead of looking the same user up again.
+current_db_user: ContextVar[Optional[User]] = ContextVar("current_db_user", default=None)
+
+
+class ClerkIdentity(NamedTuple):
+    """The few user columns most clerk_id lookups actually need."""
+    user_id: str
+    organization_id: Optional[str]
+    role: str
+
+
+def _clerk_identity_key(clerk_id: str) -> str:
+    return f"clerk:{clerk_id}"
+
+
+def _user_by_clerk_id_key(clerk_id: str) -> str:
+    return f"user:clerk:{clerk_id}"
+
+
+def _user_by_uuid_key(uuid: str) -> str:
+    return f"user:uuid:{uuid}"
+
+
+def invalidate_cached_user(clerk_id: Optional[str] = None, uuid: Optional[str] = None) -> None:
+    """
+    Drop a user from the read caches after it has been created or updated.
+    """
+    if clerk_id is not None:
+        _user_by_clerk_id_cache.pop(clerk_id, None)
+        _clerk_identity_cache.pop(clerk_id, None)
+        _synced_user_cache.pop(clerk_id, None)
+    if uuid is not None:
+        _user_by_uuid_cache.pop(uuid, None)
+
+
+def get_current_db_user(clerk_id: Optional[str] = None, uuid: Optional[str] = None) -> Optional[User]:
+    """
+    Return the db_user of the current request if it is the user identified by clerk_id or uuid.
+    """
+    db_user = current_db_user.get()
+    if db_user is None:
+        return None
+    if clerk_id is not None and db_user.clerk_id != clerk_id:
+        return None
+    if uuid is not None and db_user.id != uuid:
+        return None
+    return db_user
+
+
+async def invalidate_shared_user(clerk_id: str, uuid: Optional[str] = None) -> None:
+    """
+    Drop a user from the local caches and from the shared Redis cache after it has been
+    created or updated, so other workers don't keep serving the old copy.
+    """
+    invalidate_cached_user(clerk_id=clerk_id, uuid=uuid)
+    if redis_cache.client is not None:
+        keys = [_clerk_identity_key(clerk_id), _user_by_clerk_id_key(clerk_id)]
+        if uuid is not None:
+            keys.append(_user_by_uuid_key(uuid))
+        try:
+            await redis_cache.client.delete(*keys)
+        except RedisError:
+            logger.warning("Failed to invalidate cached user for clerk_id %s", clerk_id, exc_info=True)
+
+
+async def _get_shared_user(key: str) -> Optional[UserRead]:
+    """Read a user from the shared Redis cache; any Redis error counts as a miss."""
+    if redis_cache.client is None:
+        return None
+    try:
+        cached = await redis_cache.client.get(key)
+    except RedisError:
+        logger.warning("Failed to read cached user %s", key, exc_info=True)
+        return None
+    return UserRead.model_validate_json(cached) if cached is not None else None
+
+
+async def _set_shared_user(key: str, user: UserRead) -> None:
+    """Store a user in the shared Redis cache for USER_CACHE_TTL seconds."""
+    if redis_cache.client is None:
+        return
+    try:
+        await redis_cache.client.set(key, user.model_dump_json(), ex=settings.USER_CACHE_TTL)
+    except RedisError:
+        logger.warning("Failed to cache user %s", key, exc_info=True)
+
+
+async def resolve_clerk_identity(
+    db: AsyncSession,
+    clerk_id: str
+) -> Optional[ClerkIdentity]:
+    """
+    Resolve a Clerk ID to the user's id, organization_id and role.
+    
+    Only those three columns are selected, and the result is cached briefly in-process
+    (including a miss) and in the shared Redis cache when one is configured, so repeated
+    lookups for the same caller skip the database entirely.
+    
+    Args:
+        db: Database session
+        clerk_id: Clerk ID
+        
+    Returns:
+        The user's identity, or None if no user has this Clerk ID
+    """
+    identity = _clerk_identity_cache.get(clerk_id, _MISSING)
+    if identity is not _MISSING:
+        return identity
+
+    # Redis is only an optimization here, so any error falls through to the database
+    if redis_cache.client is not None:
+        try:
+            cached = await redis_cache.client.get(_clerk_identity_key(clerk_id))
+            if cached is not None:
+                identity = ClerkIdentity(*orjson.loads(cached))
+                _clerk_identity_cache[clerk_id] = identity
+                return identity
+        except RedisError:
+            logger.warning("Failed to read cached identity for clerk_id %s", clerk_id, exc_info=True)
+
+    # Built as a lambda statement so this per-request lookup reuses its cached compiled
+    # form without reconstructing the select; clerk_id becomes a bound parameter
+    stmt = lambda_stmt(
+        lambda: select(User.id, User.organization_id, User.role).where(User.clerk_id == clerk_id).limit(1)
+    )
+    result = await db.execute(stmt)
+    row = result.first()
+    identity = ClerkIdentity(*row) if row else None
+    _clerk_identity_cache[clerk_id] = identity
+
+    # Only found users are shared; a miss may turn into a user on the very next sync
+    if identity is not None and redis_cache.client is not None:
+        try:
+            await redis_cache.client.set(
+                _clerk_identity_key(clerk_id), orjson.dumps(tuple(identity)), ex=settings.CLERK_IDENTITY_CACHE_TTL
+            )
+        except RedisError:
+            logger.warning("Failed to cache identity for clerk_id %s", clerk_id, exc_info=True)
+    return identity
+
 
 async def get_user_by_uuid(
     db: AsyncSession,
@@ -24,7 +191,19 @@ async def get_user_by_uuid(
     Raises:
         NotFoundException: If the user is not found
     """
-    db_user = await crud_users.get(db=db, schema_to_select=UserRead, id=uuid)
+    db_user = _user_by_uuid_cache.get(uuid, _MISSING)
+    if db_user is _MISSING:
+        # Read through the shared Redis cache, so other workers' lookups are reused
+        key = _user_by_uuid_key(uuid)
+        db_user = await _get_shared_user(key)
+        if db_user is None:
+            db_user = await crud_users.get(db=db, schema_to_select=UserRead, id=uuid)
+            # Cache a validated UserRead so hits can be served without re-validation
+            db_user = UserRead.model_validate(db_user) if db_user else None
+            if db_user is not None:
+                await _set_shared_user(key, db_user)
+        _user_by_uuid_cache[uuid] = db_user
+
     if not db_user:
         raise NotFoundException("User not found")
     
@@ -49,7 +228,18 @@ async def get_user_by_clerk_id(
         NotFoundException: If the user is not found
     """
     # Use the get method with clerk_id parameter to find the user
-    db_user = await crud_users.get(db=db, schema_to_select=UserRead, clerk_id=clerk_id)
+    db_user = _user_by_clerk_id_cache.get(clerk_id, _MISSING)
+    if db_user is _MISSING:
+        # Read through the shared Redis cache, so other workers' lookups are reused
+        key = _user_by_clerk_id_key(clerk_id)
+        db_user = await _get_shared_user(key)
+        if db_user is None:
+            db_user = await crud_users.get(db=db, schema_to_select=UserRead, clerk_id=clerk_id)
+            # Cache a validated UserRead so hits can be served without re-validation
+            db_user = UserRead.model_validate(db_user) if db_user else None
+            if db_user is not None:
+                await _set_shared_user(key, db_user)
+        _user_by_clerk_id_cache[clerk_id] = db_user
     
     if not db_user:
         raise NotFoundException("User not found with the provided Clerk ID")
@@ -57,6 +247,54 @@ async def get_user_by_clerk_id(
     return db_user
 
 
+async def prefetch_user_for_sync(
+    db: AsyncSession,
+    clerk_id: str
+) -> Optional[User]:
+    """
+    Load the stored user into the session ahead of a create_or_update_user_by_clerk_id call,
+    so a sync that skips its write finds the user in the session without another query.
+    
+    Meant to run concurrently with fetching the Clerk data, which doesn't touch the session.
+    
+    Args:
+        db: Database session
+        clerk_id: Clerk ID
+        
+    Returns:
+        The user, or None if no user has this Clerk ID yet
+    """
+    stmt = lambda_stmt(
+        lambda: select(User).options(joinedload(User.organization)).where(User.clerk_id == clerk_id).limit(1)
+    )
+    result = await db.execute(stmt)
+    return result.scalars().first()
+
+
+def _is_active_email_conflict(error: IntegrityError) -> bool:
+    """
+    Whether an IntegrityError was raised by the uq_user_email_active index.
+    
+    asyncpg reports the violated constraint by name; SQLite only names the column in its message.
+    """
+    constraint_name = getattr(error.orig.__cause__, "constraint_name", None)
+    if constraint_name is not None:
+        return constraint_name == "uq_user_email_active"
+    message = str(error.orig)
+    return "uq_user_email_active" in message or "UNIQUE constraint failed: user.email" in message
+
+
+# Fields a sync is allowed to overwrite on an existing user
+_USER_UPDATE_FIELDS = frozenset(UserUpdate.model_fields)
+
+# Fields a new user can't be created without, with the error raised when one is missing
+_REQUIRED_NEW_USER_FIELDS = {
+    "first_name": "First name is required for new users",
+    "last_name": "Last name is required for new users",
+    "email": "Email is required for new users",
+}
+
+
 async def create_or_update_user_by_clerk_id(
     db: AsyncSession,
     clerk_id: str,
@@ -75,102 +313,88 @@ async def create_or_update_user_by_clerk_id(
         
     Raises:
         DuplicateValueException: If the email is already registered
+        BadRequestException: If the user doesn't exist yet and a required field is missing
     """
-    # Use a more specific query to get a single user by clerk_id
-    from sqlalchemy import select
-    from sqlmodel import select as sqlmodel_select
-    from ...models.user import User
-    
-    # First try to find a single user with this clerk_id including organization relationship
-    stmt = sqlmodel_select(User).where(User.clerk_id == clerk_id).limit(1)
-    result = await db.execute(stmt)
-    db_user_tuple = result.first()
-    
-    # Convert tuple to User object if found
-    db_user = db_user_tuple[0] if db_user_tuple else None
-    
-    # If user exists, refresh it to get the latest data including organization
-    if db_user:
-        await db.refresh(db_user)
+    # Steady-state syncs repeat the data already stored, so skip the write when no
+    # provided field differs from the user as this process last wrote it. The snapshot
+    # only makes that decision; the user returned is the one in this session (already
+    # there when prefetch_user_for_sync ran, so no query is issued)
+    synced_user = _synced_user_cache.get(clerk_id)
+    if synced_user is not None and all(
+        value is None or getattr(synced_user, key, value) == value for key, value in user_data.items()
+    ):
+        db_user = await db.get(User, synced_user.id, options=[joinedload(User.organization)])
+        if db_user is not None:
+            return db_user
+        _synced_user_cache.pop(clerk_id, None)
     
-    if db_user:
-        # Update existing user
-        update_data = user_data.copy()
-        
-        # Check if email is being changed and verify it's not already taken
-        if "email" in update_data and update_data["email"] and update_data["email"] != db_user.email:
-            # Use a direct query to check if email exists
-            email_stmt = sqlmodel_select(User).where(User.email == update_data["email"]).where(User.id != db_user.id)
-            email_result = await db.execute(email_stmt)
-            email_row_tuple = email_result.first()
-            if email_row_tuple:
+    # With everything a new user needs at hand, insert or update in a single
+    # INSERT ... ON CONFLICT (clerk_id) DO UPDATE ... RETURNING statement. A conflicting
+    # email surfaces as an IntegrityError from the uq_user_email_active index.
+    missing_field = next((field for field in _REQUIRED_NEW_USER_FIELDS if not user_data.get(field)), None)
+    if missing_field is None:
+        # Fields without a value are left out of both the insert and the update, so a new
+        # user gets the model defaults (e.g. profile_image_url) instead of NULL
+        provided = {key: value for key, value in user_data.items() if value is not None}
+        try:
+            db_user = await crud_users.upsert_by_clerk_id(
+                db=db,
+                values=User(**{**provided, "clerk_id": clerk_id}).model_dump(),
+                update_columns=list(provided)
+            )
+            await db.commit()
+        except IntegrityError as e:
+            await db.rollback()
+            if _is_active_email_conflict(e):
                 raise DuplicateValueException("Email is already registered")
-        
-        # Ensure clerk_id remains the same
-        update_data["clerk_id"] = clerk_id
-        
-        # If there are no fields to update, return the existing user
-        if len(update_data) <= 1:  # Only clerk_id is present
-            return db_user
-            
-        # Create UserUpdateInternal object with updated_at timestamp
-        update_obj = UserUpdateInternal(**update_data)
-        update_data = update_obj.dict(exclude_unset=True)  # Get only the updated fields
-        
-        # Update the user directly
-        for key, value in update_data.items():
-            setattr(db_user, key, value)
-        
-        # Set updated_at timestamp
-        db_user.updated_at = datetime.now().replace(tzinfo=None)
-        
-        # Commit the changes
-        db.add(db_user)
-        await db.commit()
-        await db.refresh(db_user)
+            raise
+        await invalidate_shared_user(clerk_id, uuid=db_user.id)
+        _synced_user_cache[clerk_id] = UserRead.model_validate(db_user)
         
         return db_user
-    else:
-        # Create new user
-        create_data = user_data.copy()
-        
-        # Ensure required fields are present
-        if "first_name" not in create_data or not create_data.get("first_name"):
-            raise BadRequestException("First name is required for new users")
-            
-        if "last_name" not in create_data or not create_data.get("last_name"):
-            raise BadRequestException("Last name is required for new users")
-            
-        if "email" not in create_data or not create_data.get("email"):
-            raise BadRequestException("Email is required for new users")
-        
-        # Check if email is already registered using direct query
-        email_stmt = sqlmodel_select(User).where(User.email == create_data["email"])
-        email_result = await db.execute(email_stmt)
-        email_row_tuple = email_result.first()
-        if email_row_tuple:
-            raise DuplicateValueException("Email is already registered")
-        
-        # Set clerk_id
-        create_data["clerk_id"] = clerk_id
-        
-        # Create user directly
-        new_user = User(**create_data)
-        db.add(new_user)
+    
+    # Partial data can only update an existing user; keep just the updatable fields that
+    # carry a value (the columns are non-nullable) instead of round-tripping through a model
+    update_data = {
+        key: value for key, value in user_data.items() if key in _USER_UPDATE_FIELDS and value is not None
+    }
+    if not update_data:
+        # Nothing to update, just return the existing user with its organization joined in
+        stmt = lambda_stmt(
+            lambda: select(User).options(joinedload(User.organization)).where(User.clerk_id == clerk_id).limit(1)
+        )
+        result = await db.execute(stmt)
+        db_user = result.scalars().first()
+        if not db_user:
+            raise BadRequestException(_REQUIRED_NEW_USER_FIELDS[missing_field])
+        return db_user
+    
+    # Update the user in a single UPDATE ... RETURNING instead of loading it first; an email
+    # taken by another active user is rejected by the uq_user_email_active index
+    try:
+        db_user = await crud_users.update_by_clerk_id(
+            db=db, clerk_id=clerk_id, values=update_data
+        )
+        if not db_user:
+            raise BadRequestException(_REQUIRED_NEW_USER_FIELDS[missing_field])
         await db.commit()
-        await db.refresh(new_user)
-        
-        return new_user
+    except IntegrityError as e:
+        await db.rollback()
+        if _is_active_email_conflict(e):
+            raise DuplicateValueException("Email is already registered")
+        raise
+    await invalidate_shared_user(clerk_id, uuid=db_user.id)
+    _synced_user_cache[clerk_id] = UserRead.model_validate(db_user)
+    
+    return db_user
 
 
 async def update_user_from_clerk(
     db: AsyncSession,
     clerk_user_data: Dict[str, Any],
-    user_data: Dict[str, Any]
+    user_data: Dict[str, Any],
+    db_user: Optional[User] = None
 ) -> UserRead:
-    import logging
-    logging.info(f"update_user_from_clerk called with clerk_user_data: {clerk_user_data}")
-    logging.info(f"Checking if user exists in database with clerk_id: {clerk_user_data['id']}")
     """
     Update or create a user from Clerk JWT data.
     
@@ -178,93 +402,68 @@ async def update_user_from_clerk(
         db: Database session
         clerk_user_data: User data from Clerk JWT
         user_data: Additional user data
+        db_user: The already loaded user (e.g. from the auth middleware), skips the user lookups
         
     Returns:
         The updated or created user
     """
-    # First check if user exists by clerk_id
-    try:
-        logging.info(f"Looking for user with clerk_id: {clerk_user_data['id']}")
-        db_user = await crud_users.get(db=db, schema_to_select=UserRead, clerk_id=clerk_user_data["id"])
-        logging.info(f"Result of get by clerk_id: {db_user}")
-    except Exception as e:
-        import traceback
-        logging.error(f"Error getting user by clerk_id: {str(e)}")
-        logging.error(traceback.format_exc())
-        raise
-    
-    # If not found by clerk_id, try by email
-    if not db_user:
-        try:
-            logging.info(f"Looking for user with email: {clerk_user_data['email']}")
-            db_user = await crud_users.get(db=db, schema_to_select=UserRead, email=clerk_user_data["email"])
-            logging.info(f"Result of get by email: {db_user}")
-        except Exception as e:
-            import traceback
-            logging.error(f"Error getting user by email: {str(e)}")
-            logging.error(traceback.format_exc())
-            raise
+    logger.debug("update_user_from_clerk called for clerk_id: %s", clerk_user_data["id"])
+    # Look the user up by clerk_id, falling back to email, in a single query
+    if db_user is None:
+        logger.debug("Looking for user with clerk_id: %s or email: %s", clerk_user_data["id"], clerk_user_data["email"])
+        db_user = await crud_users.get_by_clerk_id_or_email(
+            db=db, clerk_id=clerk_user_data["id"], email=clerk_user_data["email"]
+        )
+        logger.debug("Result of get by clerk_id or email: %s", db_user)
+
+    # Profile fields from the request body win over the JWT; the email always comes from the
+    # verified JWT. Built in one pass, dropping the fields that end up None
+    clerk_id = clerk_user_data["id"]
+    profile_data = {
+        key: value for key, value in (
+            ("first_name", user_data.get("first_name", clerk_user_data.get("first_name", ""))),
+            ("last_name", user_data.get("last_name", clerk_user_data.get("last_name", ""))),
+            ("email", clerk_user_data["email"]),
+            ("profile_image_url", user_data.get("profile_image_url", clerk_user_data.get("profile_image_url"))),
+            ("clerk_id", clerk_id),
+        ) if value is not None
+    }
 
     if db_user:
-        # Update existing user
-        # Get first_name and last_name from user_data or clerk_user_data
-        first_name = user_data.get("first_name", clerk_user_data.get("first_name", ""))
-        last_name = user_data.get("last_name", clerk_user_data.get("last_name", ""))
-        
-        update_data = {
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": clerk_user_data["email"],  # Always use email from verified JWT
-            "profile_image_url": user_data.get("profile_image_url", clerk_user_data.get("profile_image_url")),
-            "clerk_id": clerk_user_data["id"],  # Set clerk_id from JWT
-        }
+        # db_user may come from outside this session, so work on a session-local copy and
+        # leave the caller's instance untouched (merge returns db_user itself when it is
+        # already in the session)
+        db_user = await db.merge(db_user)
 
-        # Remove None values
-        update_data = {k: v for k, v in update_data.items() if v is not None}
+        # Update existing user, keeping only the values that differ from what's stored
+        update_data = {k: v for k, v in profile_data.items() if getattr(db_user, k) != v}
 
-        try:
-            logging.info(f"Updating existing user with ID: {db_user.id} and data: {update_data}")
-            updated_user = await crud_users.update(
-                db=db,
-                db_obj=db_user,
-                object=UserUpdateInternal(**update_data)
-            )
-            logging.info(f"User updated successfully: {updated_user}")
-            logging.info(f"Database operation: UPDATE user SET first_name='{update_data.get('first_name')}', last_name='{update_data.get('last_name')}' WHERE id='{db_user.id}'")
-        except Exception as e:
-            import traceback
-            logging.error(f"Error updating user: {str(e)}")
-            logging.error(traceback.format_exc())
-            raise
-        return updated_user
-    else:
-        # Create new user
-        # Get first_name and last_name from user_data or clerk_user_data
-        first_name = user_data.get("first_name", clerk_user_data.get("first_name", ""))
-        last_name = user_data.get("last_name", clerk_user_data.get("last_name", ""))
-        
-        create_data = {
-            "first_name": first_name,
-            "last_name": last_name,
-            "email": clerk_user_data["email"],
-            "profile_image_url": user_data.get("profile_image_url", clerk_user_data.get("profile_image_url")),
-            "clerk_id": clerk_user_data["id"],  # Set clerk_id from JWT
-        }
+        # Repeated logins usually carry unchanged data, so skip the UPDATE and commit entirely
+        if not update_data:
+            return db_user
 
-        # Remove None values
-        create_data = {k: v for k, v in create_data.items() if v is not None}
+        logger.debug("Updating existing user with ID: %s and data: %s", db_user.id, update_data)
+        for key, value in update_data.items():
+            setattr(db_user, key, value)
 
         try:
-            logging.info(f"Creating new user with data: {create_data}")
-            new_user = await crud_users.create(
-                db=db,
-                object=UserCreate(**create_data)
-            )
-            logging.info(f"User created successfully with ID: {new_user.id}")
-            logging.info(f"Database operation: INSERT INTO user (id, clerk_id, first_name, last_name, email, profile_image_url) VALUES ('{new_user.id}', '{create_data.get('clerk_id')}', '{create_data.get('first_name')}', '{create_data.get('last_name')}', '{create_data.get('email')}', '{create_data.get('profile_image_url')}')")
-            return new_user
-        except Exception as e:
-            import traceback
-            logging.error(f"Error creating user: {str(e)}")
-            logging.error(traceback.format_exc())
+            await db.commit()
+        except Exception:
+            await db.rollback()
             raise
+        await db.refresh(db_user)
+        # Only drop the cached copies once the change is committed
+        await invalidate_shared_user(clerk_id, uuid=db_user.id)
+        logger.debug("User updated successfully: %s", db_user.id)
+        return db_user
+    else:
+        # Create new user. The request body isn't validated upstream, so UserCreate still
+        # validates it rather than being built with model_construct
+        logger.debug("Creating new user with data: %s", profile_data)
+        new_user = await crud_users.create(
+            db=db,
+            object=UserCreate(**profile_data)
+        )
+        await invalidate_shared_user(clerk_id, uuid=new_user.id)
+        logger.debug("User created successfully with ID: %s", new_user.id)
+        return new_user
@@ -11,8 +11,10 @@ from fastapi import APIRouter, Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse
 from sqlmodel import SQLModel
 
+from .clerk.client import close_async_clerk, start_jwks_refresher, stop_jwks_refresher
 from ..middleware.client_cache_middleware import ClientCacheMiddleware
 from ..middleware.auth_middleware import ClerkAuthMiddleware
 from .config import (
@@ -27,7 +29,7 @@ from .config import (
     settings,
     CORSSettings,
 )
-from .db.database import async_engine as engine
+from .db.database import async_engine as engine, read_engine_base
 from .utils import cache, queue, rate_limit
 from ..models import *
 
@@ -106,8 +108,12 @@ def lifespan_factory(
             if isinstance(settings, RedisRateLimiterSettings):
                 await create_redis_rate_limit_pool()
 
+        start_jwks_refresher()
+
         yield
 
+        await stop_jwks_refresher()
+
         if isinstance(settings, RedisCacheSettings):
             await close_redis_cache_pool()
 
@@ -117,6 +123,13 @@ def lifespan_factory(
         if isinstance(settings, RedisRateLimiterSettings):
             await close_redis_rate_limit_pool()
 
+        await close_async_clerk()
+
+        # Close pooled connections cleanly instead of leaving them to be dropped with the process
+        await engine.dispose()
+        if read_engine_base is not engine:
+            await read_engine_base.dispose()
+
     return lifespan
 
 
@@ -189,6 +202,9 @@ def create_application(
     if isinstance(settings, EnvironmentSettings):
         kwargs.update({"docs_url": None, "redoc_url": None, "openapi_url": None})
 
+    # Render JSON responses with orjson unless the caller asks for something else
+    kwargs.setdefault("default_response_class", ORJSONResponse)
+
     lifespan = lifespan_factory(settings, create_tables_on_start=create_tables_on_start)
 
     application = FastAPI(lifespan=lifespan, **kwargs)
@@ -1,6 +1,84 @@
+from typing import Any, Dict, Iterable, Optional
+
 from fastcrud import FastCRUD
+from sqlalchemy import case, exists, func, or_, update
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+from sqlmodel import select
 
 from ..models.user import User, UserCreateInternal, UserDelete, UserUpdate, UserUpdateInternal
 
-CRUDUser = FastCRUD[User, UserCreateInternal, UserUpdate, UserUpdateInternal, UserDelete]
+
+class CRUDUser(FastCRUD[User, UserCreateInternal, UserUpdate, UserUpdateInternal, UserDelete]):
+    async def exists(self, db: AsyncSession, **kwargs: Any) -> bool:
+        """
+        Check whether a user matching the filters exists with SELECT EXISTS(...), returning a single bool
+        instead of fetching a row. Accepts the same filter syntax as FastCRUD (e.g. id__ne=...).
+        """
+        filters = self._parse_filters(**kwargs)
+        return bool(await db.scalar(select(exists().where(*filters))))
+
+    async def get_by_clerk_id_or_email(self, db: AsyncSession, clerk_id: str, email: str) -> Optional[User]:
+        """
+        Fetch the user matching either the Clerk ID or the email in a single round trip.
+        A match on clerk_id takes precedence over a match on email, decided by the ORDER BY
+        so only the winning row is transferred.
+        """
+        stmt = (
+            select(User)
+            .where(or_(User.clerk_id == clerk_id, User.email == email))
+            .order_by(case((User.clerk_id == clerk_id, 0), else_=1))
+            .limit(1)
+        )
+        result = await db.execute(stmt)
+        return result.scalars().first()
+
+    async def upsert_by_clerk_id(
+        self, db: AsyncSession, values: Dict[str, Any], update_columns: Optional[Iterable[str]] = None
+    ) -> User:
+        """
+        Insert a user or, if the clerk_id already exists, update it, in one statement returning the row.
+        On conflict only `update_columns` are overwritten (all keys in `values` besides id/clerk_id/created_at
+        when omitted), so columns such as role or organization_id are never reset by a sync.
+        The caller is responsible for committing the session.
+        """
+        insert = postgresql_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+        stmt = insert(User).values(**values)
+        if update_columns is None:
+            update_columns = values.keys()
+        set_ = {
+            key: stmt.excluded[key] for key in update_columns if key not in ("id", "clerk_id", "created_at")
+        }
+        # ON CONFLICT DO UPDATE doesn't apply column onupdate defaults, so set it explicitly
+        set_["updated_at"] = func.now()
+        stmt = stmt.on_conflict_do_update(index_elements=[User.clerk_id], set_=set_).returning(User)
+        # Load the returned row as a User, refreshing any copy already in the session, and fetch
+        # its organization (only issued when the row has one) so callers never lazy-load it
+        orm_stmt = (
+            select(User)
+            .from_statement(stmt)
+            .options(selectinload(User.organization))
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(orm_stmt)
+        return result.scalars().one()
+
+    async def update_by_clerk_id(self, db: AsyncSession, clerk_id: str, values: Dict[str, Any]) -> Optional[User]:
+        """
+        Update the user with the given Clerk ID in one UPDATE ... RETURNING statement.
+        Returns None when no user has this clerk_id. The caller is responsible for committing the session.
+        """
+        stmt = update(User).where(User.clerk_id == clerk_id).values(**values).returning(User)
+        orm_stmt = (
+            select(User)
+            .from_statement(stmt)
+            .options(selectinload(User.organization))
+            .execution_options(populate_existing=True)
+        )
+        result = await db.execute(orm_stmt)
+        return result.scalars().one_or_none()
+
+
 crud_users = CRUDUser(User)
@@ -1,5 +1,37 @@
+import atexit
+import logging.config
+
 from .api import router
-from .core.config import settings
+from .core.config import EnvironmentOption, settings
+from .core.logger import LOG_FILE_PATH, LOGGING_FORMAT, start_queue_logging
 from .core.setup import create_application
 
+# Configure logging once for the whole application instead of in individual modules
+logging.config.dictConfig(
+    {
+        "version": 1,
+        "disable_existing_loggers": False,
+        "formatters": {
+            "default": {"format": LOGGING_FORMAT},
+        },
+        "handlers": {
+            "stderr": {"class": "logging.StreamHandler", "formatter": "default", "stream": "ext://sys.stderr"},
+            "file": {
+                "class": "logging.handlers.RotatingFileHandler",
+                "formatter": "default",
+                "filename": LOG_FILE_PATH,
+                "maxBytes": 10485760,
+                "backupCount": 5,
+            },
+        },
+        "root": {
+            "level": "WARNING" if settings.ENVIRONMENT == EnvironmentOption.PRODUCTION else "INFO",
+            "handlers": ["stderr", "file"],
+        },
+    }
+)
+# Write log records from a background thread so logging never blocks the event loop
+_log_listener = start_queue_logging()
+atexit.register(_log_listener.stop)
+
 app = create_application(router=router, settings=settings)
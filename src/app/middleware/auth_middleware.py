@@ -1,110 +1,49 @@
 from fastapi import Request, Response, HTTPException, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
+from sqlalchemy.orm import joinedload
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from jose import jwt
-from jose.exceptions import JWTError
-import requests
-from typing import List, Optional, Dict, Any, Callable
+from starlette.datastructures import MutableHeaders
+from starlette.types import Message, Receive, Scope, Send
+from typing import List, Optional, Tuple
+import asyncio
+import itertools
+import os
 import re
 import logging
-import json
 import time
-import sys
-import traceback
-from functools import lru_cache
-from jwcrypto import jwk
+from functools import cached_property
+from cachetools import TTLCache
 
-# Configure root logger to output to stderr
-root_logger = logging.getLogger()
-if not root_logger.handlers:
-    handler = logging.StreamHandler(sys.stderr)
-    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-    root_logger.addHandler(handler)
-    root_logger.setLevel(logging.INFO)
+logger = logging.getLogger(__name__)
 
 # Import Clerk client
-from ..core.clerk.client import clerk, get_user_by_id_async
-from ..core.service.user_service import create_or_update_user_by_clerk_id
-from ..core.db.database import async_get_db
-
-# Import configuration
+from ..core.clerk.client import get_user_by_id_async, token_digest, verify_clerk_token
+from ..core.service.user_service import create_or_update_user_by_clerk_id, current_db_user, prefetch_user_for_sync
+from ..core.db.database import local_session
 from ..core.config import settings
+from ..models.user import User
 
-# JWKS configuration
-# For Clerk, we need to use the instance-specific JWKS URL
-CLERK_ISSUER = getattr(settings, "CLERK_JWT_ISSUER", "https://summary-tarpon-14.clerk.accounts.dev")
-CLERK_AUDIENCE = getattr(settings, "CLERK_AUDIENCE", "http://localhost:3000")  # Frontend URL
+# Recently authenticated tokens, keyed by token_digest of the token (never the token itself),
+# mapping to (expires_at, clerk_user, user_id). A hit skips signature verification, the Clerk
+# API call and the user sync. Entries never outlive the token's own exp claim. Only the user's
+# id is cached; the user itself is loaded in each request's own session.
+_authenticated_token_cache: TTLCache = TTLCache(
+    maxsize=settings.AUTH_SESSION_CACHE_MAX_SIZE, ttl=settings.AUTH_SESSION_CACHE_TTL
+)
 
-@lru_cache(maxsize=1)
-def get_jwks() -> Dict[str, Any]:
-    """Fetch and cache the JWKS from Clerk
-    
-    This function is cached to avoid making repeated requests to the JWKS endpoint.
-    The cache is valid for the lifetime of the application or until manually cleared.
-    
-    Returns:
-        Dict[str, Any]: The JWKS response as a dictionary
-        
-    Raises:
-        HTTPException: If the JWKS endpoint returns an error
-    """
-    # Use the instance-specific JWKS URL based on the issuer
-    jwks_url = f"{CLERK_ISSUER}/.well-known/jwks.json"
-    try:
-        logging.info(f"Fetching JWKS from {jwks_url}")
-        response = requests.get(jwks_url, timeout=5)  # Add timeout to prevent hanging
-        response.raise_for_status()  # Raise exception for 4XX/5XX responses
-        return response.json()
-    except requests.exceptions.Timeout:
-        logging.error(f"Timeout while fetching JWKS from {jwks_url}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Authentication service is temporarily unavailable"
-        )
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to fetch JWKS: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail=f"Failed to connect to authentication service: {str(e)}"
-        )
-    except ValueError as e:  # JSON parsing error
-        logging.error(f"Invalid JWKS response: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_502_BAD_GATEWAY,
-            detail="Invalid response from authentication service"
-        )
+# Request IDs are a per-process counter prefixed with the pid, so they stay unique under
+# concurrency without reading the clock
+_request_counter = itertools.count()
+_request_id_prefix = f"req_{os.getpid():x}_"
 
-def get_jwk_kid(token: str) -> str:
-    """Extract the key ID from the JWT header"""
-    headers = jwt.get_unverified_header(token)
-    return headers["kid"]
+# Path patterns containing none of these are plain prefixes and can skip the regex engine
+_REGEX_METACHARACTERS = frozenset(".^$*+?{}[]\\|()")
 
-def get_public_key(kid: str) -> str:
-    """Get the public key for the given key ID from the JWKS"""
-    jwks = get_jwks()
-    for key_dict in jwks["keys"]:
-        if key_dict["kid"] == kid:
-            key = jwk.JWK(**key_dict)
-            return key.export_to_pem().decode()
-    raise Exception(f"Public key not found for kid: {kid}")
+# Session token claims that are enough to build the user without asking the Clerk API
+_REQUIRED_PROFILE_CLAIMS = ("email", "first_name", "last_name")
 
-def verify_clerk_token(token: str) -> Dict[str, Any]:
-    """Verify a Clerk JWT token using JWKS"""
-    try:
-        kid = get_jwk_kid(token)
-        public_key = get_public_key(kid)
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=["RS256"],
-            audience=CLERK_AUDIENCE,
-            issuer=CLERK_ISSUER
-        )
-        return payload
-    except JWTError as e:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid token: {str(e)}")
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Failed to validate token: {str(e)}")
 
 class ClerkUser(BaseModel):
     """Clerk user data model
@@ -120,9 +59,9 @@ class ClerkUser(BaseModel):
     last_name: Optional[str] = None
     profile_image_url: Optional[str] = None
     
-    @property
-    def name(self) -> str:
-        """Get the full name of the user"""
+    @cached_property
+    def name(self) -> Optional[str]:
+        """Get the full name of the user (computed once per ClerkUser)"""
         return f"{self.first_name or ''} {self.last_name or ''}".strip() or None
 
 
@@ -163,36 +102,86 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
         self.protected_paths = protected_paths or ["/api/v1/user/me"]
         self.exclude_paths = exclude_paths or ["/api/v1/user/uuid/"]
         
-        # Convert path patterns to regex for more flexible matching
-        self.protected_regexes = [re.compile(pattern) for pattern in self.protected_paths]
-        self.exclude_regexes = [re.compile(pattern) for pattern in self.exclude_paths]
+        # Patterns are matched at the start of the path. Plain path prefixes (the usual case) are
+        # checked with one str.startswith over a tuple; only patterns using regex syntax go
+        # through a regex, combined into a single alternation per list
+        self._protected_prefixes, self._protected_re = self._compile_patterns(self.protected_paths)
+        self._exclude_prefixes, self._exclude_re = self._compile_patterns(self.exclude_paths)
+        # Paths equal to a literal pattern are answered with a set lookup; whether a protected
+        # literal is itself excluded is worked out here, once
+        self._exclude_exact = frozenset(self._exclude_prefixes)
+        self._protected_exact = frozenset(
+            prefix for prefix in self._protected_prefixes
+            if not self._matches(prefix, self._exclude_prefixes, self._exclude_re)
+        )
+    
+    @staticmethod
+    def _compile_patterns(patterns: List[str]) -> Tuple[Tuple[str, ...], Optional["re.Pattern[str]"]]:
+        """Split path patterns into literal prefixes and one regex matching any of the others."""
+        prefixes = tuple(pattern for pattern in patterns if not _REGEX_METACHARACTERS.intersection(pattern))
+        regexes = [pattern for pattern in patterns if _REGEX_METACHARACTERS.intersection(pattern)]
+        regex = re.compile("|".join(f"(?:{pattern})" for pattern in regexes)) if regexes else None
+        return prefixes, regex
+    
+    @staticmethod
+    def _matches(path: str, prefixes: Tuple[str, ...], regex: Optional["re.Pattern[str]"]) -> bool:
+        return path.startswith(prefixes) or (regex is not None and regex.match(path) is not None)
     
     def is_path_protected(self, path: str) -> bool:
         """Check if the path should be protected by authentication."""
-        # First check if path is in excluded paths
-        for pattern in self.exclude_regexes:
-            if pattern.match(path):
-                logging.info(f"Path {path} is excluded from authentication by pattern {pattern.pattern}")
-                return False
-                
-        # Then check if path is in protected paths
-        for pattern in self.protected_regexes:
-            if pattern.match(path):
-                logging.info(f"Path {path} is protected by pattern {pattern.pattern}")
-                return True
-            else:
-                logging.debug(f"Path {path} did not match protection pattern {pattern.pattern}")
-                
-        logging.info(f"Path {path} is not protected (no matching patterns)")
-        return False
+        if path in self._exclude_exact:
+            return False
+        if path in self._protected_exact:
+            return True
+        # Excluded paths take precedence over protected ones
+        protected = (
+            self._matches(path, self._protected_prefixes, self._protected_re)
+            and not self._matches(path, self._exclude_prefixes, self._exclude_re)
+        )
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Path %s is %s", path, "protected" if protected else "not protected")
+        return protected
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Tag every HTTP request with a request ID and pass those needing no authentication straight to the app.
+        
+        The ID is stored in request.state.request_id and returned in the X-Request-ID header
+        for all HTTP requests. OPTIONS requests (CORS preflight) and unprotected paths skip
+        BaseHTTPMiddleware entirely, which would otherwise wrap them in an extra task and
+        response stream.
+        """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        # Generate a unique request ID for tracing
+        request_id = f"{_request_id_prefix}{next(_request_counter):x}"
+        scope.setdefault("state", {})["request_id"] = request_id
+        
+        async def send_with_request_id(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Request-ID", request_id)
+            await send(message)
+        
+        if scope["method"] == "OPTIONS" or not self.is_path_protected(scope["path"]):
+            await self.app(scope, receive, send_with_request_id)
+            return
+        await super().__call__(scope, receive, send_with_request_id)
     
-    async def _validate_token(self, token: str) -> dict:
+    @staticmethod
+    def _error_response(status_code: int, detail: str, headers: Optional[dict] = None) -> JSONResponse:
+        """Build the error response FastAPI would send for an HTTPException with this detail."""
+        return JSONResponse({"detail": detail}, status_code=status_code, headers=headers)
+    
+    async def _validate_token(self, token: str, token_key: Optional[bytes] = None) -> dict:
         """Validate the JWT token and return the payload.
         
         Parameters
         ----------
         token: str
             The JWT token to validate.
+        token_key: bytes, optional
+            The token's digest, if already computed, reused as the claims cache key.
             
         Returns
         -------
@@ -204,18 +193,8 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
         HTTPException
             If the token is invalid.
         """
-        # Verify the token using JWKS
-        payload = verify_clerk_token(token)
-        logging.info(f"JWT Payload: {payload}")
-        
-        # Validate required claims for user creation
-        if not payload.get("sub"):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token: missing subject claim"
-            )
-            
-        return payload
+        # Verify the token using JWKS; the decode already requires the sub, exp and iat claims
+        return await verify_clerk_token(token, cache_key=token_key)
     
     async def _get_user_data(self, user_id: str, payload: dict) -> dict:
         """Get user data from Clerk API or fallback to JWT payload.
@@ -232,14 +211,22 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
         dict
             The user data.
         """
+        # The token's signature has already been verified, so when it carries the profile
+        # claims there is no need for a round trip to the Clerk API
+        if settings.CLERK_TRUST_JWT_CLAIMS and all(payload.get(claim) for claim in _REQUIRED_PROFILE_CLAIMS):
+            return {
+                "id": user_id,
+                "email": payload["email"],
+                "first_name": payload["first_name"],
+                "last_name": payload["last_name"],
+                "profile_image_url": payload.get("image_url")
+            }
+        
         try:
             # Fetch complete user data from Clerk API
-            logging.info(f"Fetching user data from Clerk API for user_id: {user_id}")
+            logger.debug("Fetching user data from Clerk API for user_id: %s", user_id)
             clerk_user_response = await get_user_by_id_async(user_id)
             
-            # Log the complete clerk_user_response for debugging
-            logging.info(f"Clerk API response: {clerk_user_response}")
-            
             # Extract user data from Clerk API response
             user_data = {
                 "id": user_id,
@@ -248,18 +235,17 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
                 "last_name": clerk_user_response.last_name or "",
                 "profile_image_url": clerk_user_response.profile_image_url
             }
-            logging.info(f"User data from Clerk API: {user_data}")
             return user_data
         except HTTPException as http_ex:
             # Handle HTTP exceptions from the Clerk client
-            logging.warning(f"HTTP error from Clerk API: {http_ex.detail} (status: {http_ex.status_code})")
+            logger.warning("HTTP error from Clerk API: %s (status: %s)", http_ex.detail, http_ex.status_code)
             if http_ex.status_code == 404:
-                logging.warning(f"User {user_id} not found in Clerk. Using JWT payload instead.")
+                logger.warning("User %s not found in Clerk. Using JWT payload instead.", user_id)
             else:
-                logging.error(f"Unexpected HTTP error from Clerk API: {http_ex.detail}")
+                logger.error("Unexpected HTTP error from Clerk API: %s", http_ex.detail)
         except Exception as e:
             # Fallback to JWT payload if API call fails
-            logging.warning(f"Failed to fetch user data from Clerk API: {str(e)}. Using JWT payload instead.")
+            logger.warning("Failed to fetch user data from Clerk API: %s. Using JWT payload instead.", e)
         
         # Fallback to JWT payload
         first_name = payload.get("first_name", "")
@@ -293,18 +279,21 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
             If the ClerkUser instance cannot be created.
         """
         try:
-            clerk_user = ClerkUser(**user_data)
-            logging.info(f"Successfully created ClerkUser object: {clerk_user}")
+            # The fields come from the verified token or the Clerk API, so skip pydantic
+            # validation and only check the one field the user sync can't do without
+            if not isinstance(user_data.get("email"), str):
+                raise ValueError("email must be a string")
+            clerk_user = ClerkUser.model_construct(**user_data)
+            logger.debug("Created ClerkUser object for user_id: %s", clerk_user.id)
             return clerk_user
         except Exception as e:
-            logging.error(f"Error creating ClerkUser object: {str(e)}")
-            logging.error(traceback.format_exc())
+            logger.exception("Error creating ClerkUser object: %s", e)
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Error creating user object: {str(e)}"
             )
     
-    async def _sync_user_with_database(self, clerk_user: ClerkUser, request: Request):
+    async def _sync_user_with_database(self, db: AsyncSession, clerk_user: ClerkUser, request: Request):
         """Sync the user with the database and store the db_user in request.state.
         
         This method creates or updates the database user based on the Clerk user data.
@@ -313,6 +302,8 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
         
         Parameters
         ----------
+        db: AsyncSession
+            The request-scoped session, also handed to the route through async_get_db.
         clerk_user: ClerkUser
             The ClerkUser instance (intermediate representation).
         request: Request
@@ -324,17 +315,17 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
             The database user object or None if there was an error.
         """
         try:
-            # Get DB session
-            db_generator = async_get_db()
-            db = await anext(db_generator)
-            
             # Create or update user in database using clerk_id
-            logging.info(f"Creating or updating user in database with clerk_id: {clerk_user.id}")
+            logger.debug("Creating or updating user in database with clerk_id: %s", clerk_user.id)
+            # Leave out what the token or the Clerk API didn't provide (a session token often
+            # has no image_url), so a new user gets the column defaults instead of NULL
             user_data = {
-                "first_name": clerk_user.first_name,
-                "last_name": clerk_user.last_name,
-                "email": clerk_user.email,
-                "profile_image_url": clerk_user.profile_image_url
+                key: value for key, value in (
+                    ("first_name", clerk_user.first_name),
+                    ("last_name", clerk_user.last_name),
+                    ("email", clerk_user.email),
+                    ("profile_image_url", clerk_user.profile_image_url),
+                ) if value is not None
             }
             
             # Use create_or_update_user_by_clerk_id to get a proper db user object
@@ -343,19 +334,18 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
                 clerk_id=clerk_user.id,
                 user_data=user_data
             )
-            logging.info(f"User in database: {db_user}")
+            logger.debug("User in database: %s", db_user.id)
             
             # Store the db_user in request.state
             # This is the primary user object that should be used by routes
             request.state.db_user = db_user
-            
-            # Close DB session
-            await db_generator.aclose()
+            current_db_user.set(db_user)
             
             return db_user
         except Exception as e:
-            logging.error(f"Error checking/updating user in database: {str(e)}")
-            logging.error(traceback.format_exc())
+            logger.exception("Error checking/updating user in database: %s", e)
+            # The route reuses this session, so don't hand it over mid-failed transaction
+            await db.rollback()
             # Don't raise an exception here, continue with authentication
             return None
     
@@ -376,12 +366,7 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
         Returns
         -------
         Response
-            The response from the route handler.
-            
-        Raises
-        ------
-        HTTPException
-            If there is an error processing the response.
+            The response from the route handler, or a 500 response if it raised.
         """
         try:
             response = await call_next(request)
@@ -390,79 +375,69 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
             total_time = time.time() - start_time
             response.headers["X-Process-Time"] = str(total_time)
             response.headers["X-Auth-Time"] = str(request.state.auth_time)
-            logging.info(f"[{request_id}] Total request time: {total_time:.3f}s")
-            
-            # Add request ID to response headers
-            response.headers["X-Request-ID"] = request_id
+            logger.info("[%s] Total request time: %.3fs", request_id, total_time)
             
             return response
         except Exception as e:
-            logging.error(f"[{request_id}] Error during request processing: {str(e)}")
-            logging.error(traceback.format_exc())
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Internal server error: {str(e)}"
-            )
+            # The details go to the log only; the exception text may carry SQL or internals
+            logger.exception("[%s] Error during request processing: %s", request_id, e)
+            return self._error_response(status.HTTP_500_INTERNAL_SERVER_ERROR, "Internal server error")
     
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
-        """Process the request and validate JWT token for protected routes.
+    async def _authenticate(self, request: Request, db: AsyncSession, token: str, start_time: float) -> None:
+        """Authenticate the token and attach clerk_user and db_user to the request state.
         
         Parameters
         ----------
         request: Request
             The incoming request.
-        call_next: RequestResponseEndpoint
-            The next middleware or route handler in the processing chain.
-            
-        Returns
-        -------
-        Response
-            The response from the route handler.
+        db: AsyncSession
+            The request-scoped session, also handed to the route through async_get_db.
+        token: str
+            The bearer token.
+        start_time: float
+            The start time of the request; cached authentications must outlive it.
             
         Raises
         ------
         HTTPException
-            If authentication fails for a protected route.
+            If the token is invalid or the user data can't be built.
         """
-        # Generate a unique request ID for tracing
-        request_id = f"req_{int(time.time() * 1000)}"
-        request.state.request_id = request_id
-        start_time = time.time()
-        
-        # Always allow OPTIONS requests (for CORS preflight)
-        if request.method == "OPTIONS":
-            return await call_next(request)
-            
-        # Check if this path requires authentication
-        if not self.is_path_protected(request.url.path):
-            return await call_next(request)
-            
-        # Get the authorization header
-        auth_header = request.headers.get("Authorization")
-        
-        # Log request info for debugging
-        logging.info(f"Request path: {request.url.path}, method: {request.method}")
-        logging.info(f"Authorization header: {auth_header}" if auth_header else "No Authorization header")
-        
-        if not auth_header or not auth_header.startswith("Bearer "):
-            logging.warning(f"Missing or invalid authorization header for {request.url.path}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Missing or invalid authorization header"
-            )
-            
-        # Extract the token
-        token = auth_header.split(" ")[1]
-        
-        try:
+        # Reuse a recent authentication of the same token. Concurrent requests with the same
+        # token may all miss and authenticate; each stores an equivalent entry, so the last
+        # insert winning is harmless and the cache needs no lock
+        token_key = token_digest(token)
+        cached = _authenticated_token_cache.get(token_key)
+        db_user = None
+        if cached is not None and cached[0] > start_time:
+            _, clerk_user, user_id = cached
+            # Load the user in this request's session; a user deleted since is authenticated again
+            db_user = await db.get(User, user_id, options=[joinedload(User.organization)])
+            if db_user is None:
+                _authenticated_token_cache.pop(token_key, None)
+            else:
+                request.state.clerk_user = clerk_user
+                request.state.db_user = db_user
+                current_db_user.set(db_user)
+        if db_user is None:
             # Validate the token
-            payload = await self._validate_token(token)
+            payload = await self._validate_token(token, token_key)
             
             # Get the user ID from the token
-            user_id = payload.get("sub")
-            
-            # Get user data from Clerk API or fallback to JWT payload
-            user_data = await self._get_user_data(user_id, payload)
+            user_id = payload["sub"]
+            
+            # Get user data from Clerk API or fallback to JWT payload. The stored user
+            # is loaded meanwhile, so the sync below can skip an unchanged write
+            user_data, prefetched = await asyncio.gather(
+                self._get_user_data(user_id, payload),
+                prefetch_user_for_sync(db, user_id),
+                return_exceptions=True
+            )
+            if isinstance(user_data, BaseException):
+                raise user_data
+            if isinstance(prefetched, BaseException):
+                # Only an optimization; the sync below still runs and handles DB errors
+                logger.warning("Could not prefetch user %s: %s", user_id, prefetched)
+                await db.rollback()
             
             # Create ClerkUser instance (intermediate representation from Clerk)
             clerk_user = await self._create_clerk_user(user_data)
@@ -470,26 +445,62 @@ class ClerkAuthMiddleware(BaseHTTPMiddleware):
             
             # Sync user with database and store db_user in request.state
             # db_user is the primary user object that should be used by routes
-            db_user = await self._sync_user_with_database(clerk_user, request)
+            db_user = await self._sync_user_with_database(db, clerk_user, request)
             
             # If db_user is None, log a warning but continue
             if db_user is None:
-                logging.warning("Could not sync user with database, continuing with authentication")
+                logger.warning("Could not sync user with database, continuing with authentication")
+            else:
+                expires_at = min(payload["exp"], start_time + settings.AUTH_SESSION_CACHE_TTL)
+                _authenticated_token_cache[token_key] = (expires_at, clerk_user, db_user.id)
+    
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        """Process the request and validate JWT token for protected routes.
+        
+        Parameters
+        ----------
+        request: Request
+            The incoming request.
+        call_next: RequestResponseEndpoint
+            The next middleware or route handler in the processing chain.
+            
+        Returns
+        -------
+        Response
+            The response from the route handler, or an error response if authentication
+            fails for a protected route.
+        """
+        # Set by __call__, which also adds it to the response headers
+        request_id = request.state.request_id
+        start_time = time.time()
+        
+        # Get the authorization header
+        auth_header = request.headers.get("Authorization")
+        
+        # Log request info for debugging; never the header itself, it carries the bearer token
+        logger.debug("Request path: %s, method: %s", request.url.path, request.method)
+        
+        # Extract the token by slicing off the "Bearer " prefix; a bare prefix counts as missing
+        token = auth_header[7:].strip() if auth_header and auth_header.startswith("Bearer ") else ""
+        if not token:
+            logger.warning("Missing or invalid authorization header for %s", request.url.path)
+            return self._error_response(status.HTTP_401_UNAUTHORIZED, "Missing or invalid authorization header")
+        
+        # One session serves both the user sync and the route (via async_get_db), so an
+        # authenticated request checks out a single pooled connection.
+        async with local_session() as db:
+            request.state.db = db
+            try:
+                await self._authenticate(request, db, token, start_time)
+            except HTTPException as e:
+                # An HTTPException raised in dispatch never reaches the app's exception
+                # handlers, so turn it into the response here
+                return self._error_response(e.status_code, e.detail, e.headers)
             
             # Add request timing information
-            request.state.auth_time = time.time() - start_time
-            logging.info(f"[{request_id}] Authentication completed in {request.state.auth_time:.3f}s")
+            auth_time = time.time() - start_time
+            request.state.auth_time = auth_time
+            logger.debug("[%s] Authentication completed in %.3fs", request_id, auth_time)
             
             # Process the response
             return await self._process_response(request, call_next, start_time, request_id)
-            
-        except HTTPException:
-            # Re-raise HTTP exceptions directly
-            raise
-        except Exception as e:
-            # Catch any other exceptions
-            logging.error(f"[{request_id}] Authentication error: {str(e)}")
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"Authentication failed: {str(e)}"
-            )
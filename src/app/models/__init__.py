@@ -1,5 +1,5 @@
-# from .post import Post
-# from .rate_limit import RateLimit
-# from .tier import Tier
 from .user import User
 from .organization import Organization
+
+# Every table model, so `from app.models import *` registers them all with SQLModel.metadata
+__all__ = ["User", "Organization"]
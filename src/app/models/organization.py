@@ -1,8 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from typing import Optional, TYPE_CHECKING
 from sqlmodel import SQLModel, Field, Relationship
 from src.app.core.uuid.uuid_types import OrgUUID
-from .user import User
+
+if TYPE_CHECKING:
+    from .user import User
 
 
 class Organization(SQLModel, table=True):
@@ -12,7 +14,7 @@ class Organization(SQLModel, table=True):
     org_url: Optional[str] = Field(default=None, index=True, schema_extra={"example": "acme-corp"})
     
     # Metadata Fields
-    created_at: datetime = Field(default_factory=lambda: datetime.now().replace(tzinfo=None))
+    created_at: datetime = Field(default_factory=datetime.now)
     updated_at: Optional[datetime] = None
     deleted_at: Optional[datetime] = None
     is_deleted: bool = Field(default=False)
@@ -21,10 +23,6 @@ class Organization(SQLModel, table=True):
     users: list["User"] = Relationship(back_populates="organization")
 
 
-# Add the relationship to User model
-User.update_forward_refs()
-
-
 class OrganizationRead(SQLModel):
     """Schema for reading organization data."""
     id: str
@@ -50,10 +48,10 @@ class OrganizationUpdate(SQLModel):
 
 class OrganizationUpdateInternal(OrganizationUpdate):
     """Schema for internal organization updates with timestamp."""
-    updated_at: datetime = Field(default_factory=lambda: datetime.now().replace(tzinfo=None))
+    updated_at: datetime = Field(default_factory=datetime.now)
 
 
 class OrganizationDelete(SQLModel):
     """Schema for soft-deleting an organization."""
     is_deleted: bool = True
-    deleted_at: datetime = Field(default_factory=lambda: datetime.now().replace(tzinfo=None))
+    deleted_at: datetime = Field(default_factory=datetime.now)
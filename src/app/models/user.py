@@ -1,5 +1,6 @@
 from datetime import datetime
 from typing import Optional, TYPE_CHECKING
+from sqlalchemy import Column, DateTime, Index, func, text
 from sqlmodel import SQLModel, Field, Relationship
 from ..core.uuid.uuid_types import UserUUID
 
@@ -8,6 +9,22 @@ if TYPE_CHECKING:
 
 
 class User(SQLModel, table=True):
+    # Partial index backing the "active members of an organization" listing, and email
+    # uniqueness among non-deleted users, enforced by the database instead of a pre-check query
+    __table_args__ = (
+        Index("ix_user_org_active", "organization_id", postgresql_where=text("is_deleted = false")),
+        Index(
+            "uq_user_email_active",
+            "email",
+            unique=True,
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = false"),
+        ),
+    )
+    # Fetch server-generated values (updated_at) with RETURNING at flush time, since an
+    # AsyncSession can't lazily load an expired attribute afterwards
+    __mapper_args__ = {"eager_defaults": True}
+
     id: str = Field(default_factory=UserUUID.create, primary_key=True)  # Primary Key using TypedUUID
     clerk_id: Optional[str] = Field(default=None, index=True, unique=True)
     first_name: str = Field(default="", min_length=0, max_length=30, schema_extra={"example": "Mike"})
@@ -19,7 +36,6 @@ class User(SQLModel, table=True):
         return f"{self.first_name} {self.last_name}".strip()
     email: str = Field(
         ...,
-        unique=True,
         index=True,
         nullable=False,
         schema_extra={"example": "user.userson@example.com"}
@@ -35,8 +51,11 @@ class User(SQLModel, table=True):
     organization: Optional["Organization"] = Relationship(back_populates="users")
 
     # Metadata Fields
-    created_at: datetime = Field(default_factory=lambda: datetime.now().replace(tzinfo=None))
-    updated_at: Optional[datetime] = None
+    created_at: datetime = Field(default_factory=datetime.now)
+    # Set by the database on every UPDATE
+    updated_at: Optional[datetime] = Field(
+        default=None, sa_column=Column(DateTime(timezone=True), nullable=True, onupdate=func.now())
+    )
     deleted_at: Optional[datetime] = None
     is_deleted: bool = Field(default=False)
 
@@ -85,7 +104,7 @@ class UserUpdate(SQLModel):
 
 
 class UserUpdateInternal(UserUpdate):
-    updated_at: Optional[datetime] = Field(default_factory=lambda: datetime.now().replace(tzinfo=None))
+    updated_at: Optional[datetime] = Field(default_factory=datetime.now)
 
 
 class UserTierUpdate(SQLModel):
@@ -94,7 +113,7 @@ class UserTierUpdate(SQLModel):
 
 class UserDelete(SQLModel):
     is_deleted: bool
-    deleted_at: datetime = Field(default_factory=lambda: datetime.now().replace(tzinfo=None))
+    deleted_at: datetime = Field(default_factory=datetime.now)
 
 
 class UserRestoreDeleted(SQLModel):
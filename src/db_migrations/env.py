@@ -4,14 +4,15 @@ from logging.config import fileConfig
 
 from alembic import context
 from app.core.config import settings, DBOption
+from app.core.db.database import connect_args
 from sqlmodel import SQLModel
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
 
-# Import models explicitly to ensure they're registered with SQLModel.metadata
-from app.models.user import User
-# Import any other models here as needed
+# Import all models so they're registered with SQLModel.metadata; new models only
+# need adding to app.models.__all__
+from app.models import *  # noqa: F401,F403
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -92,6 +93,9 @@ async def run_async_migrations() -> None:
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        # Same driver settings as the app: SSL, and asyncpg's statement caches (enabled by
+        # default) turned off only behind a transaction-mode pooler that can't keep them
+        connect_args=connect_args,
     )
 
     async with connectable.connect() as connection:
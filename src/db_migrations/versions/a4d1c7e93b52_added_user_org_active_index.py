@@ -0,0 +1,34 @@
+"""Added user org active index
+
+Revision ID: a4d1c7e93b52
+Revises: c63590c649fe
+Create Date: 2026-10-15 10:12:41.503217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4d1c7e93b52'
+down_revision: Union[str, None] = 'c63590c649fe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_user_org_active',
+        'user',
+        ['organization_id'],
+        unique=False,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_user_org_active', table_name='user', postgresql_where=sa.text('is_deleted = false'))
@@ -0,0 +1,42 @@
+"""Partial active user email unique index on SQLite
+
+Revision ID: b7e41f2c9d63
+Revises: 5c2e9d4b7a10
+Create Date: 2026-10-15 16:41:08.517302
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e41f2c9d63'
+down_revision: Union[str, None] = '5c2e9d4b7a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # PostgreSQL already has the partial index; SQLite got a full unique index, which
+    # also rejected the email of a soft-deleted user
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.drop_index('uq_user_email_active', table_name='user')
+    op.create_index(
+        'uq_user_email_active',
+        'user',
+        ['email'],
+        unique=True,
+        sqlite_where=sa.text('is_deleted = false'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.drop_index('uq_user_email_active', table_name='user', sqlite_where=sa.text('is_deleted = false'))
+    op.create_index('uq_user_email_active', 'user', ['email'], unique=True)
@@ -0,0 +1,38 @@
+"""Added active user email unique index
+
+Revision ID: e3b8f05a61c4
+Revises: a4d1c7e93b52
+Create Date: 2026-10-15 11:02:17.284903
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e3b8f05a61c4'
+down_revision: Union[str, None] = 'a4d1c7e93b52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'uq_user_email_active',
+        'user',
+        ['email'],
+        unique=True,
+        postgresql_where=sa.text('is_deleted = false'),
+    )
+    op.drop_index(op.f('ix_user_email'), table_name='user')
+    op.create_index(op.f('ix_user_email'), 'user', ['email'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_user_email'), table_name='user')
+    op.create_index(op.f('ix_user_email'), 'user', ['email'], unique=True)
+    op.drop_index('uq_user_email_active', table_name='user', postgresql_where=sa.text('is_deleted = false'))
@@ -28,12 +28,6 @@ POSTGRES_SERVER = os.getenv("POSTGRES_SERVER", "")
 POSTGRES_PORT = os.getenv("POSTGRES_PORT", "5432")
 POSTGRES_DB = os.getenv("POSTGRES_DB", "")
 
-print(f"Database Engine: {DB_ENGINE}")
-
-if DB_ENGINE != "postgres":
-    print("Not using PostgreSQL. Exiting.")
-    exit(0)
-
 # URL encode the password to handle special characters
 encoded_password = urllib.parse.quote_plus(POSTGRES_PASSWORD)
 
@@ -69,59 +63,37 @@ def test_sync_connection():
         return False
 
 # Test asynchronous connection with asyncpg
-async def test_async_connection():
-    print("\n--- Testing Asynchronous Connection (asyncpg) ---")
+async def _try_async_connection(ssl: bool) -> bool:
+    label = "with SSL" if ssl else "without SSL"
     try:
-        # Try with SSL enabled (default)
-        print("Attempting connection with SSL enabled...")
-        print(f"Connecting to: postgresql://{POSTGRES_USER}:***@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}")
-        
+        # ssl=None keeps asyncpg's default (SSL preferred)
         conn = await asyncpg.connect(
             user=POSTGRES_USER,
             password=POSTGRES_PASSWORD,
             host=POSTGRES_SERVER,
             port=POSTGRES_PORT,
-            database=POSTGRES_DB
+            database=POSTGRES_DB,
+            ssl=None if ssl else False
         )
         
         # Execute a test query
         version = await conn.fetchval("SELECT version();")
-        print(f"PostgreSQL version: {version}")
         
         # Close the connection
         await conn.close()
-        print("Asynchronous connection test (with SSL): SUCCESS")
+        print(f"Asynchronous connection test ({label}): SUCCESS, PostgreSQL version: {version}")
         return True
     except Exception as e:
-        print(f"Asynchronous connection test (with SSL): FAILED")
+        print(f"Asynchronous connection test ({label}): FAILED")
         print(f"Error: {str(e)}")
-        
-        # Try again with SSL disabled
-        try:
-            print("\nAttempting connection with SSL disabled...")
-            print(f"Connecting to: postgresql://{POSTGRES_USER}:***@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}?sslmode=disable")
-            
-            conn = await asyncpg.connect(
-                user=POSTGRES_USER,
-                password=POSTGRES_PASSWORD,
-                host=POSTGRES_SERVER,
-                port=POSTGRES_PORT,
-                database=POSTGRES_DB,
-                ssl=False
-            )
-            
-            # Execute a test query
-            version = await conn.fetchval("SELECT version();")
-            print(f"PostgreSQL version: {version}")
-            
-            # Close the connection
-            await conn.close()
-            print("Asynchronous connection test (without SSL): SUCCESS")
-            return True
-        except Exception as e2:
-            print(f"Asynchronous connection test (without SSL): FAILED")
-            print(f"Error: {str(e2)}")
-            return False
+        return False
+
+async def test_async_connection():
+    print("\n--- Testing Asynchronous Connection (asyncpg) ---")
+    print(f"Connecting to: postgresql://{POSTGRES_USER}:***@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB} with and without SSL")
+    # The two attempts are independent, so run them at the same time
+    with_ssl, without_ssl = await asyncio.gather(_try_async_connection(True), _try_async_connection(False))
+    return with_ssl or without_ssl
 
 # Test connection string format
 def test_connection_string_formats():
@@ -150,11 +122,12 @@ async def main():
     # Test connection string formats
     test_connection_string_formats()
     
-    # Test synchronous connection
-    sync_result = test_sync_connection()
-    
-    # Test asynchronous connection
-    async_result = await test_async_connection()
+    # Run the synchronous and asynchronous probes at the same time; the blocking
+    # psycopg2 probe goes to a worker thread
+    sync_result, async_result = await asyncio.gather(
+        asyncio.to_thread(test_sync_connection),
+        test_async_connection()
+    )
     
     # Summary
     print("\n=== Test Summary ===")
@@ -171,4 +144,8 @@ async def main():
 
 # Run the main function
 if __name__ == "__main__":
+    print(f"Database Engine: {DB_ENGINE}")
+    if DB_ENGINE != "postgres":
+        print("Not using PostgreSQL. Exiting.")
+        raise SystemExit(0)
     asyncio.run(main())
@@ -1,10 +1,73 @@
+import asyncio
+
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlmodel import SQLModel
 
+from src.app.core.service import organization_service, user_service
+from src.app.core.utils import cache as redis_cache
 from src.app.main import app
+from src.app.middleware import auth_middleware
 
 
 @pytest.fixture(scope="session")
 def client():
     with TestClient(app) as _client:
         yield _client
+
+
+@pytest.fixture
+def session_factory():
+    """Session factory for an in-memory SQLite database with every table created."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+
+    async def create_tables() -> None:
+        async with engine.begin() as conn:
+            await conn.run_sync(SQLModel.metadata.create_all)
+
+    asyncio.run(create_tables())
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
+
+
+class FakeRedis:
+    """In-memory stand-in for the async Redis client, covering the calls the services make."""
+
+    def __init__(self) -> None:
+        self.data: dict = {}
+
+    async def get(self, key: str):
+        return self.data.get(key)
+
+    async def set(self, key: str, value, ex=None) -> None:
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch: pytest.MonkeyPatch) -> FakeRedis:
+    client = FakeRedis()
+    monkeypatch.setattr(redis_cache, "client", client)
+    return client
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Start every test with empty per-process caches."""
+    caches = (
+        user_service._user_by_uuid_cache,
+        user_service._user_by_clerk_id_cache,
+        user_service._clerk_identity_cache,
+        user_service._synced_user_cache,
+        organization_service._organization_cache,
+        auth_middleware._authenticated_token_cache,
+    )
+    for cache in caches:
+        cache.clear()
+    yield
+    for cache in caches:
+        cache.clear()
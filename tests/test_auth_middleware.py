@@ -0,0 +1,231 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.app.middleware import auth_middleware
+from src.app.middleware.auth_middleware import ClerkAuthMiddleware
+from src.app.models.user import User
+
+PROTECTED_PATHS = [r"/api/v1/auth/me", r"/api/v1/organization", r"/api/v1/organization/.*"]
+EXCLUDE_PATHS = [r"/api/v1/user/uuid/.*", r"/api/v1/user/clerk/.*", r"/api/v1/organization/public"]
+
+
+def _create_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/auth/me")
+    async def me(request: Request) -> dict:
+        return {"id": request.state.db_user.id, "clerk_id": request.state.clerk_user.id}
+
+    @app.get("/api/v1/organization/fail")
+    async def fail() -> dict:
+        raise RuntimeError("SELECT secret FROM internals")
+
+    app.add_middleware(ClerkAuthMiddleware, protected_paths=PROTECTED_PATHS, exclude_paths=EXCLUDE_PATHS)
+    return app
+
+
+@pytest.fixture
+def app_client(session_factory, monkeypatch: pytest.MonkeyPatch) -> TestClient:
+    monkeypatch.setattr(auth_middleware, "local_session", session_factory)
+    return TestClient(_create_app(), raise_server_exceptions=False)
+
+
+def _auth(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def _claims(**overrides) -> dict:
+    now = int(time.time())
+    claims = {
+        "sub": "clerk_1",
+        "iat": now,
+        "exp": now + 60,
+        "email": "mike@example.com",
+        "first_name": "Mike",
+        "last_name": "Tyson",
+        "image_url": "https://example.com/mike.png",
+    }
+    claims.update(overrides)
+    return claims
+
+
+class _Verifier:
+    """Stands in for verify_clerk_token, accepting any token as signed by Clerk with these claims."""
+
+    def __init__(self, claims: dict) -> None:
+        self.claims = claims
+        self.tokens: list = []
+
+    async def __call__(self, token: str, cache_key=None) -> dict:
+        self.tokens.append(token)
+        return self.claims
+
+
+@pytest.fixture
+def verifier(monkeypatch: pytest.MonkeyPatch) -> _Verifier:
+    verifier = _Verifier(_claims())
+    monkeypatch.setattr(auth_middleware, "verify_clerk_token", verifier)
+    return verifier
+
+
+@pytest.mark.parametrize("headers", [{}, {"Authorization": "Bearer "}, {"Authorization": "Basic abc"}])
+def test_missing_token_is_rejected(app_client: TestClient, headers: dict) -> None:
+    response = app_client.get("/api/v1/auth/me", headers=headers)
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Missing or invalid authorization header"}
+    assert response.headers["X-Request-ID"]
+
+
+@pytest.mark.parametrize("token", ["WzFd.e30.signature", "e30.WzFd.signature", "not-a-jwt", "a.b.c"])
+def test_malformed_token_is_rejected(app_client: TestClient, token: str) -> None:
+    response = app_client.get("/api/v1/auth/me", headers=_auth(token))
+
+    assert response.status_code == 401
+    assert response.json() == {"detail": "Invalid token"}
+    assert response.headers["X-Request-ID"]
+
+
+def test_route_error_returns_a_fixed_message(app_client: TestClient, verifier: _Verifier) -> None:
+    response = app_client.get("/api/v1/organization/fail", headers=_auth("valid-token"))
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "Internal server error"}
+    assert response.headers["X-Request-ID"]
+
+
+def test_claims_fast_path_builds_the_user_from_the_token(
+    app_client: TestClient, verifier: _Verifier, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def fail(user_id: str):
+        raise AssertionError("a token carrying the profile must not call the Clerk API")
+
+    monkeypatch.setattr(auth_middleware, "get_user_by_id_async", fail)
+    response = app_client.get("/api/v1/auth/me", headers=_auth("valid-token"))
+
+    assert response.status_code == 200
+    assert response.json()["clerk_id"] == "clerk_1"
+
+
+def test_token_without_image_url_creates_the_user(
+    app_client: TestClient, verifier: _Verifier, session_factory
+) -> None:
+    del verifier.claims["image_url"]
+
+    response = app_client.get("/api/v1/auth/me", headers=_auth("valid-token"))
+
+    assert response.status_code == 200
+
+    async def load_user() -> User:
+        async with session_factory() as db:
+            return await db.get(User, response.json()["id"])
+
+    user = asyncio.run(load_user())
+    assert user.clerk_id == "clerk_1"
+    assert user.profile_image_url == User.model_fields["profile_image_url"].default
+
+
+def test_cached_token_skips_verification(app_client: TestClient, verifier: _Verifier) -> None:
+    first = app_client.get("/api/v1/auth/me", headers=_auth("valid-token"))
+    second = app_client.get("/api/v1/auth/me", headers=_auth("valid-token"))
+
+    assert first.status_code == second.status_code == 200
+    assert second.json() == first.json()
+    assert verifier.tokens == ["valid-token"]
+
+    # Only the user id is cached, never the user itself
+    (_, _, user_id), = auth_middleware._authenticated_token_cache.values()
+    assert user_id == first.json()["id"]
+
+
+def test_expired_cached_token_is_verified_again(app_client: TestClient, verifier: _Verifier) -> None:
+    app_client.get("/api/v1/auth/me", headers=_auth("valid-token"))
+    token_key, (_, clerk_user, user_id) = next(iter(auth_middleware._authenticated_token_cache.items()))
+    auth_middleware._authenticated_token_cache[token_key] = (time.time() - 1, clerk_user, user_id)
+
+    response = app_client.get("/api/v1/auth/me", headers=_auth("valid-token"))
+
+    assert response.status_code == 200
+    assert verifier.tokens == ["valid-token", "valid-token"]
+
+
+def test_cache_entry_never_outlives_the_token(app_client: TestClient, verifier: _Verifier) -> None:
+    verifier.claims["exp"] = int(time.time()) + 2
+
+    app_client.get("/api/v1/auth/me", headers=_auth("valid-token"))
+
+    (expires_at, _, _), = auth_middleware._authenticated_token_cache.values()
+    assert expires_at == verifier.claims["exp"]
+
+
+def _middleware(protected_paths=PROTECTED_PATHS, exclude_paths=EXCLUDE_PATHS) -> ClerkAuthMiddleware:
+    return ClerkAuthMiddleware(_create_app(), protected_paths=protected_paths, exclude_paths=exclude_paths)
+
+
+def test_regex_patterns_share_one_alternation() -> None:
+    middleware = _middleware()
+
+    assert middleware._protected_re.pattern == "(?:/api/v1/organization/.*)"
+    assert middleware._exclude_re.pattern == "(?:/api/v1/user/uuid/.*)|(?:/api/v1/user/clerk/.*)"
+
+
+@pytest.mark.parametrize(
+    "path, protected",
+    [
+        ("/api/v1/organization/users", True),
+        ("/api/v1/user/uuid/123", False),
+        ("/api/v1/user/clerk/user_123", False),
+        ("/prefix/api/v1/organization/users", False),
+    ],
+)
+def test_regex_patterns_match_at_the_start_of_the_path(path: str, protected: bool) -> None:
+    middleware = _middleware(protected_paths=[r"/api/v1/organization/.*", r"/api/v1/user/.*"])
+
+    assert middleware.is_path_protected(path) is protected
+
+
+def test_plain_patterns_are_matched_as_prefixes() -> None:
+    middleware = _middleware()
+
+    assert middleware._protected_prefixes == ("/api/v1/auth/me", "/api/v1/organization")
+    assert middleware._exclude_prefixes == ("/api/v1/organization/public",)
+
+
+@pytest.mark.parametrize(
+    "path, protected",
+    [
+        ("/api/v1/auth/me/", True),
+        ("/api/v1/organizations", True),
+        ("/api/v1/organization/public/logo", False),
+        ("/api/v1/user/me", False),
+        ("/", False),
+    ],
+)
+def test_is_path_protected_by_prefix(path: str, protected: bool) -> None:
+    assert _middleware().is_path_protected(path) is protected
+
+
+def test_exact_path_sets() -> None:
+    middleware = _middleware()
+
+    assert middleware._protected_exact == frozenset({"/api/v1/auth/me", "/api/v1/organization"})
+    assert middleware._exclude_exact == frozenset({"/api/v1/organization/public"})
+
+
+def test_protected_literal_that_is_also_excluded_is_not_in_the_exact_set() -> None:
+    middleware = _middleware(protected_paths=["/api/v1/user/uuid/me", "/api/v1/auth/me"])
+
+    assert middleware._protected_exact == frozenset({"/api/v1/auth/me"})
+    assert not middleware.is_path_protected("/api/v1/user/uuid/me")
+
+
+@pytest.mark.parametrize(
+    "path, protected",
+    [("/api/v1/auth/me", True), ("/api/v1/organization", True), ("/api/v1/organization/public", False)],
+)
+def test_exact_paths(path: str, protected: bool) -> None:
+    assert _middleware().is_path_protected(path) is protected
@@ -0,0 +1,174 @@
+import asyncio
+import base64
+import gc
+import time
+from types import SimpleNamespace
+
+import httpx
+import jwt
+import orjson
+import pytest
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+
+from src.app.core.clerk import client
+from src.app.core.clerk.client import verify_clerk_token
+
+
+def _segment(value) -> str:
+    return base64.urlsafe_b64encode(orjson.dumps(value)).rstrip(b"=").decode()
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        f"{_segment([1])}.{_segment({'sub': 'user_1'})}.signature",
+        f"{_segment({'alg': 'RS256', 'kid': 'kid_1'})}.{_segment(['sub', 'user_1'])}.signature",
+        f"{_segment({'alg': 'RS256', 'kid': 'kid_1'})}.{_segment('user_1')}.signature",
+        "not-a-jwt",
+        "a.b.c",
+    ],
+)
+def test_verify_clerk_token_rejects_malformed_token(token: str) -> None:
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(verify_clerk_token(token))
+    assert exc_info.value.status_code == 401
+    assert exc_info.value.detail == "Invalid token"
+
+
+def test_concurrent_user_lookups_share_one_api_call(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    async def get_async(user_id: str):
+        calls.append(user_id)
+        await asyncio.sleep(0)
+        return SimpleNamespace(
+            id=user_id, first_name="Mike", last_name="Tyson", email_addresses=[], profile_image_url=None
+        )
+
+    monkeypatch.setattr(client, "get_async_clerk", lambda: SimpleNamespace(users=SimpleNamespace(get_async=get_async)))
+    monkeypatch.setattr(client, "_clerk_user_cache", {})
+
+    async def lookup_concurrently():
+        return await asyncio.gather(*(client.get_user_by_id_async("user_1") for _ in range(5)))
+
+    users = asyncio.run(lookup_concurrently())
+
+    assert calls == ["user_1"]
+    assert {user.clerk_id for user in users} == {"user_1"}
+    gc.collect()
+    assert "user_1" not in client._clerk_user_locks
+
+
+@pytest.fixture
+def empty_jwks(monkeypatch: pytest.MonkeyPatch) -> list:
+    """Serve an empty JWKS and record the force_refresh flag of every get_jwks call."""
+    refreshes = []
+
+    async def get_jwks(force_refresh: bool = False) -> dict:
+        refreshes.append(force_refresh)
+        return client._jwks
+
+    monkeypatch.setattr(client, "get_jwks", get_jwks)
+    monkeypatch.setattr(client, "_jwks", {"keys": []})
+    monkeypatch.setattr(client, "_previous_jwks_keys", {})
+    monkeypatch.setattr(client, "_jwks_refreshed_at", 0.0)
+    client.get_public_key.cache_clear()
+    return refreshes
+
+
+def test_unknown_kid_refetch_is_rate_limited(empty_jwks: list) -> None:
+    for _ in range(3):
+        with pytest.raises(LookupError):
+            asyncio.run(client.get_public_key_with_refresh("unknown_kid"))
+
+    assert empty_jwks.count(True) == 1
+
+
+def test_unknown_kid_refetches_again_after_the_interval(empty_jwks: list, monkeypatch: pytest.MonkeyPatch) -> None:
+    with pytest.raises(LookupError):
+        asyncio.run(client.get_public_key_with_refresh("unknown_kid"))
+    monkeypatch.setattr(client, "_jwks_refreshed_at", client._jwks_refreshed_at - client.JWKS_REFRESH_MIN_INTERVAL)
+    with pytest.raises(LookupError):
+        asyncio.run(client.get_public_key_with_refresh("unknown_kid"))
+
+    assert empty_jwks.count(True) == 2
+
+
+def _jwk(kid: str) -> dict:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048).public_key()
+    return {**orjson.loads(jwt.algorithms.RSAAlgorithm.to_jwk(key)), "kid": kid, "alg": "RS256", "use": "sig"}
+
+
+@pytest.fixture
+def jwks_endpoint(monkeypatch: pytest.MonkeyPatch) -> list:
+    """Serve the last JWKS appended to the returned list from the JWKS endpoint."""
+    served: list = []
+
+    async def get(url: str, headers: dict) -> httpx.Response:
+        return httpx.Response(200, content=orjson.dumps(served[-1]), request=httpx.Request("GET", url))
+
+    monkeypatch.setattr(client, "_get_clerk_http", lambda: SimpleNamespace(get=get))
+    monkeypatch.setattr(client, "_jwks", None)
+    monkeypatch.setattr(client, "_jwks_etag", None)
+    monkeypatch.setattr(client, "_jwks_expires_at", 0.0)
+    monkeypatch.setattr(client, "_jwks_checked_at", 0.0)
+    monkeypatch.setattr(client, "_previous_jwks_keys", {})
+    monkeypatch.setattr(client, "_previous_jwks_expires_at", 0.0)
+    client.get_public_key.cache_clear()
+    yield served
+    client.get_public_key.cache_clear()
+
+
+def test_keys_of_the_rotated_jwks_are_accepted_during_the_grace_period(jwks_endpoint: list) -> None:
+    jwks_endpoint.append({"keys": [_jwk("old_kid")]})
+    asyncio.run(client.get_jwks())
+    jwks_endpoint.append({"keys": [_jwk("new_kid")]})
+    asyncio.run(client.get_jwks(force_refresh=True))
+
+    assert asyncio.run(client.get_public_key_with_refresh("new_kid")).key_id == "new_kid"
+    assert asyncio.run(client.get_public_key_with_refresh("old_kid")).key_id == "old_kid"
+    with pytest.raises(LookupError):
+        client.get_public_key("old_kid")
+
+
+def test_keys_of_the_rotated_jwks_expire_after_the_grace_period(
+    jwks_endpoint: list, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    jwks_endpoint.append({"keys": [_jwk("old_kid")]})
+    asyncio.run(client.get_jwks())
+    jwks_endpoint.append({"keys": [_jwk("new_kid")]})
+    asyncio.run(client.get_jwks(force_refresh=True))
+    monkeypatch.setattr(client, "_previous_jwks_expires_at", time.monotonic())
+
+    with pytest.raises(LookupError):
+        client._get_previous_public_key("old_kid")
+
+
+def test_background_refresher_warms_then_revalidates_the_jwks(monkeypatch: pytest.MonkeyPatch) -> None:
+    refreshes = []
+
+    async def get_jwks(force_refresh: bool = False) -> dict:
+        refreshes.append(force_refresh)
+        if len(refreshes) == 1:
+            raise HTTPException(status_code=503, detail="Authentication service is temporarily unavailable")
+        client._jwks = {"keys": []}
+        return client._jwks
+
+    monkeypatch.setattr(client, "get_jwks", get_jwks)
+    monkeypatch.setattr(client, "_jwks", None)
+    monkeypatch.setattr(client, "_jwks_expires_at", 0.0)
+    monkeypatch.setattr(client, "_jwks_refresher_task", None)
+    monkeypatch.setattr(client, "JWKS_REFRESH_AHEAD", 0.01)
+
+    async def run_refresher() -> None:
+        client.start_jwks_refresher()
+        await asyncio.sleep(0.1)
+        await client.stop_jwks_refresher()
+
+    asyncio.run(run_refresher())
+
+    # A failed pass doesn't stop the refresher; once warm it revalidates the cached JWKS
+    assert refreshes[:2] == [False, False]
+    assert True in refreshes[2:]
+    assert client._jwks_refresher_task is None
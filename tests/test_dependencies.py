@@ -0,0 +1,50 @@
+from typing import Annotated, Any
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from src.app.api.dependencies import optional_json_body
+
+
+@pytest.fixture(scope="module")
+def body_client() -> TestClient:
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(body: Annotated[dict[str, Any], Depends(optional_json_body)]) -> dict[str, Any]:
+        return body
+
+    return TestClient(app)
+
+
+def test_empty_body_is_an_empty_dict(body_client: TestClient) -> None:
+    response = body_client.post("/echo")
+
+    assert response.status_code == 200
+    assert response.json() == {}
+
+
+def test_chunked_empty_body_is_an_empty_dict(body_client: TestClient) -> None:
+    response = body_client.post("/echo", content=iter([b""]))
+
+    assert response.status_code == 200
+    assert response.json() == {}
+
+
+def test_json_object_is_returned(body_client: TestClient) -> None:
+    response = body_client.post("/echo", json={"first_name": "Mike"})
+
+    assert response.status_code == 200
+    assert response.json() == {"first_name": "Mike"}
+
+
+@pytest.mark.parametrize(
+    "content, detail",
+    [(b"{not json", "Invalid JSON body"), (b"[1, 2]", "Request body must be a JSON object")],
+)
+def test_invalid_body_is_rejected(body_client: TestClient, content: bytes, detail: str) -> None:
+    response = body_client.post("/echo", content=content, headers={"Content-Type": "application/json"})
+
+    assert response.status_code == 422
+    assert response.json() == {"detail": detail}
@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+from sqlalchemy.orm import joinedload
+
+from src.app.core.exceptions.http_exceptions import DuplicateValueException
+from src.app.core.service import organization_service
+from src.app.core.service.organization_service import get_organization_by_user_id, update_organization
+from src.app.crud.crud_organizations import crud_organizations
+from src.app.models.organization import Organization, OrganizationUpdate
+from src.app.models.user import User
+
+
+@pytest.fixture
+def organizations(session_factory):
+    async def create_data() -> None:
+        async with session_factory() as db:
+            db.add(Organization(id="org_1", name="Acme", org_url="acme"))
+            db.add(Organization(id="org_2", name="Globex", org_url="globex"))
+            db.add(User(id="user_1", clerk_id="clerk_1", email="user@example.com", organization_id="org_1"))
+            await db.commit()
+
+    asyncio.run(create_data())
+    return session_factory
+
+
+def _update(session_factory, organization_data: OrganizationUpdate):
+    async def update():
+        async with session_factory() as db:
+            return await update_organization(db=db, user_id="clerk_1", organization_data=organization_data)
+
+    return asyncio.run(update())
+
+
+def _get(session_factory):
+    async def get():
+        async with session_factory() as db:
+            return await get_organization_by_user_id(db=db, user_id="clerk_1")
+
+    return asyncio.run(get())
+
+
+def test_organization_reads_are_cached(organizations, monkeypatch: pytest.MonkeyPatch) -> None:
+    first = _get(organizations)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("a cached organization must not be read from the database")
+
+    monkeypatch.setattr(crud_organizations, "get", fail)
+    second = _get(organizations)
+
+    assert second == first
+    assert organization_service._organization_cache["org_1"] == first
+
+
+def test_update_refreshes_the_cached_organization(organizations) -> None:
+    _get(organizations)
+    _update(organizations, OrganizationUpdate(name="Acme Corporation"))
+
+    assert _get(organizations).name == "Acme Corporation"
+
+
+def test_update_organization(organizations) -> None:
+    organization = _update(organizations, OrganizationUpdate(name="Acme Corporation", org_url="acme-corp"))
+
+    assert organization.id == "org_1"
+    assert organization.name == "Acme Corporation"
+    assert organization.org_url == "acme-corp"
+
+
+def test_update_organization_keeps_its_own_org_url(organizations) -> None:
+    organization = _update(organizations, OrganizationUpdate(name="Acme Corporation", org_url="acme"))
+
+    assert organization.org_url == "acme"
+
+
+def test_update_organization_rejects_org_url_of_another_organization(organizations) -> None:
+    with pytest.raises(DuplicateValueException):
+        _update(organizations, OrganizationUpdate(org_url="globex"))
+
+    organization_service._organization_cache.clear()
+    assert _update(organizations, OrganizationUpdate()).org_url == "acme"
+
+
+def test_rejected_update_leaves_the_loaded_user_usable(organizations) -> None:
+    async def update() -> None:
+        async with organizations() as db:
+            db_user = await db.get(User, "user_1", options=[joinedload(User.organization)])
+            with pytest.raises(DuplicateValueException):
+                await update_organization(
+                    db=db, user_id="clerk_1", organization_data=OrganizationUpdate(org_url="globex"), db_user=db_user
+                )
+            # Expired attributes would need an implicit lazy load, which fails on an AsyncSession
+            assert db_user.clerk_id == "clerk_1"
+            assert db_user.organization.name == "Acme"
+
+    asyncio.run(update())
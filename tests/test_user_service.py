@@ -0,0 +1,299 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from redis.exceptions import RedisError
+from sqlalchemy.exc import IntegrityError
+
+from src.app.core.exceptions.http_exceptions import DuplicateValueException, NotFoundException
+from src.app.core.service import user_service
+from src.app.core.service.user_service import create_or_update_user_by_clerk_id
+from src.app.crud.crud_users import crud_users
+from src.app.models.user import User, UserRead
+
+USER_DATA = {
+    "first_name": "Mike",
+    "last_name": "Tyson",
+    "email": "mike@example.com",
+    "profile_image_url": "https://example.com/mike.png",
+}
+
+
+def _sync(session_factory, clerk_id: str, user_data: dict) -> User:
+    async def sync() -> User:
+        async with session_factory() as db:
+            return await create_or_update_user_by_clerk_id(db=db, clerk_id=clerk_id, user_data=user_data)
+
+    return asyncio.run(sync())
+
+
+def test_sync_caches_a_snapshot(session_factory) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+
+    snapshot = user_service._synced_user_cache["clerk_1"]
+    assert isinstance(snapshot, UserRead)
+    assert snapshot.id == created.id
+
+
+def test_unchanged_sync_skips_the_write(session_factory, monkeypatch: pytest.MonkeyPatch) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("an unchanged sync must not write the user")
+
+    monkeypatch.setattr(crud_users, "upsert_by_clerk_id", fail)
+    synced = _sync(session_factory, "clerk_1", USER_DATA)
+
+    assert isinstance(synced, User)
+    assert synced.id == created.id
+
+
+def test_unchanged_sync_returns_user_of_the_callers_session(session_factory) -> None:
+    _sync(session_factory, "clerk_1", USER_DATA)
+
+    async def sync_twice() -> None:
+        async with session_factory() as first, session_factory() as second:
+            first_user = await create_or_update_user_by_clerk_id(db=first, clerk_id="clerk_1", user_data=USER_DATA)
+            second_user = await create_or_update_user_by_clerk_id(db=second, clerk_id="clerk_1", user_data=USER_DATA)
+            assert first_user is not second_user
+            assert first_user in first
+            assert second_user in second
+
+    asyncio.run(sync_twice())
+
+
+def test_changed_sync_writes_the_user(session_factory) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+    updated = _sync(session_factory, "clerk_1", {**USER_DATA, "first_name": "Michael"})
+
+    assert updated.id == created.id
+    assert updated.first_name == "Michael"
+    assert user_service._synced_user_cache["clerk_1"].first_name == "Michael"
+
+
+def test_upsert_without_profile_image_url_uses_the_default(session_factory) -> None:
+    user_data = {**USER_DATA, "profile_image_url": None}
+    created = _sync(session_factory, "clerk_1", user_data)
+
+    assert created.profile_image_url == User.model_fields["profile_image_url"].default
+
+
+def test_upsert_without_profile_image_url_keeps_the_stored_one(session_factory) -> None:
+    _sync(session_factory, "clerk_1", USER_DATA)
+    updated = _sync(session_factory, "clerk_1", {**USER_DATA, "first_name": "Michael", "profile_image_url": None})
+
+    assert updated.first_name == "Michael"
+    assert updated.profile_image_url == USER_DATA["profile_image_url"]
+
+
+def test_email_of_another_active_user_is_rejected(session_factory) -> None:
+    _sync(session_factory, "clerk_1", USER_DATA)
+
+    with pytest.raises(DuplicateValueException):
+        _sync(session_factory, "clerk_2", USER_DATA)
+
+
+def test_email_of_a_deleted_user_can_be_reused(session_factory) -> None:
+    deleted = _sync(session_factory, "clerk_1", USER_DATA)
+
+    async def delete_user() -> None:
+        async with session_factory() as db:
+            user = await db.get(User, deleted.id)
+            user.is_deleted = True
+            await db.commit()
+
+    asyncio.run(delete_user())
+    created = _sync(session_factory, "clerk_2", USER_DATA)
+
+    assert created.id != deleted.id
+
+
+def test_other_integrity_errors_are_not_reported_as_duplicate_email(
+    session_factory, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def fail(*args, **kwargs):
+        raise IntegrityError("INSERT INTO user ...", {}, Exception("NOT NULL constraint failed: user.email"))
+
+    monkeypatch.setattr(crud_users, "upsert_by_clerk_id", fail)
+
+    with pytest.raises(IntegrityError):
+        _sync(session_factory, "clerk_1", USER_DATA)
+
+
+CLERK_USER_DATA = {"id": "clerk_1", **USER_DATA}
+
+
+def _update_from_clerk(session_factory, user_data: dict, fail_on_commit: bool = False) -> User:
+    async def update() -> User:
+        async with session_factory() as db:
+            if fail_on_commit:
+                async def fail():
+                    raise AssertionError("unchanged profile data must not be committed")
+
+                db.commit = fail
+            return await user_service.update_user_from_clerk(
+                db=db, clerk_user_data=CLERK_USER_DATA, user_data=user_data
+            )
+
+    return asyncio.run(update())
+
+
+def test_update_from_clerk_skips_the_write_when_nothing_changed(session_factory) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+
+    updated = _update_from_clerk(session_factory, {}, fail_on_commit=True)
+
+    assert updated.id == created.id
+
+
+def test_update_from_clerk_writes_changed_fields(session_factory) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+
+    updated = _update_from_clerk(session_factory, {"first_name": "Michael"})
+
+    assert updated.id == created.id
+    assert updated.first_name == "Michael"
+
+
+def _get_by_uuid(session_factory, uuid: str) -> UserRead:
+    async def get() -> UserRead:
+        async with session_factory() as db:
+            return await user_service.get_user_by_uuid(db=db, uuid=uuid)
+
+    return asyncio.run(get())
+
+
+def _get_by_clerk_id(session_factory, clerk_id: str) -> UserRead:
+    async def get() -> UserRead:
+        async with session_factory() as db:
+            return await user_service.get_user_by_clerk_id(db=db, clerk_id=clerk_id)
+
+    return asyncio.run(get())
+
+
+def test_user_lookup_miss_is_cached(session_factory, monkeypatch: pytest.MonkeyPatch) -> None:
+    with pytest.raises(NotFoundException):
+        _get_by_uuid(session_factory, "unknown")
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("a cached miss must not be looked up again")
+
+    monkeypatch.setattr(crud_users, "get", fail)
+
+    with pytest.raises(NotFoundException):
+        _get_by_uuid(session_factory, "unknown")
+    assert user_service._user_by_uuid_cache["unknown"] is None
+
+
+def test_user_lookup_hit_is_cached(session_factory, monkeypatch: pytest.MonkeyPatch) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+    first = _get_by_uuid(session_factory, created.id)
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("a cached user must not be looked up again")
+
+    monkeypatch.setattr(crud_users, "get", fail)
+
+    assert _get_by_uuid(session_factory, created.id) == first
+
+
+def test_sync_drops_a_cached_miss(session_factory) -> None:
+    with pytest.raises(NotFoundException):
+        _get_by_clerk_id(session_factory, "clerk_1")
+
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+
+    assert _get_by_clerk_id(session_factory, "clerk_1").id == created.id
+
+
+def _resolve_identity(session_factory, clerk_id: str):
+    async def resolve():
+        async with session_factory() as db:
+            return await user_service.resolve_clerk_identity(db=db, clerk_id=clerk_id)
+
+    return asyncio.run(resolve())
+
+
+def test_identity_is_shared_through_redis(session_factory, fake_redis) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+    identity = _resolve_identity(session_factory, "clerk_1")
+    assert identity.user_id == created.id
+
+    # Another worker starts with an empty in-process cache and no database access
+    user_service._clerk_identity_cache.clear()
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("an identity cached in Redis must not be queried")
+
+    async def resolve_without_db():
+        db = SimpleNamespace(execute=fail)
+        return await user_service.resolve_clerk_identity(db=db, clerk_id="clerk_1")
+
+    assert asyncio.run(resolve_without_db()) == identity
+
+
+def test_identity_miss_is_not_shared(session_factory, fake_redis) -> None:
+    assert _resolve_identity(session_factory, "clerk_1") is None
+
+    assert fake_redis.data == {}
+
+
+def test_redis_errors_fall_back_to_the_database(
+    session_factory, fake_redis, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+
+    async def fail(*args, **kwargs):
+        raise RedisError("connection refused")
+
+    monkeypatch.setattr(fake_redis, "get", fail)
+    monkeypatch.setattr(fake_redis, "set", fail)
+
+    assert _resolve_identity(session_factory, "clerk_1").user_id == created.id
+
+
+def test_sync_drops_the_shared_identity(session_factory, fake_redis) -> None:
+    _sync(session_factory, "clerk_1", USER_DATA)
+    _resolve_identity(session_factory, "clerk_1")
+    assert "clerk:clerk_1" in fake_redis.data
+
+    _sync(session_factory, "clerk_1", {**USER_DATA, "first_name": "Michael"})
+
+    assert "clerk:clerk_1" not in fake_redis.data
+
+
+def test_user_lookups_read_through_redis(session_factory, fake_redis, monkeypatch: pytest.MonkeyPatch) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+    by_uuid = _get_by_uuid(session_factory, created.id)
+    by_clerk_id = _get_by_clerk_id(session_factory, "clerk_1")
+    assert {f"user:uuid:{created.id}", "user:clerk:clerk_1"} <= fake_redis.data.keys()
+
+    # Another worker starts with empty in-process caches and finds the users in Redis
+    user_service._user_by_uuid_cache.clear()
+    user_service._user_by_clerk_id_cache.clear()
+
+    async def fail(*args, **kwargs):
+        raise AssertionError("a user cached in Redis must not be read from the database")
+
+    monkeypatch.setattr(crud_users, "get", fail)
+
+    assert _get_by_uuid(session_factory, created.id) == by_uuid
+    assert _get_by_clerk_id(session_factory, "clerk_1") == by_clerk_id
+
+
+def test_user_lookup_miss_is_not_shared(session_factory, fake_redis) -> None:
+    with pytest.raises(NotFoundException):
+        _get_by_uuid(session_factory, "unknown")
+
+    assert fake_redis.data == {}
+
+
+def test_sync_drops_the_shared_users(session_factory, fake_redis) -> None:
+    created = _sync(session_factory, "clerk_1", USER_DATA)
+    _get_by_uuid(session_factory, created.id)
+    _get_by_clerk_id(session_factory, "clerk_1")
+
+    _sync(session_factory, "clerk_1", {**USER_DATA, "first_name": "Michael"})
+
+    assert fake_redis.data == {}
+    assert _get_by_uuid(session_factory, created.id).first_name == "Michael"
@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.app.api.v1 import users
+from src.app.core.db.database import async_get_db
+from src.app.core.exceptions.http_exceptions import BadRequestException
+from src.app.core.service import user_service
+
+CLERK_USER = SimpleNamespace(
+    id="clerk_1",
+    email="mike@example.com",
+    first_name="Mike",
+    last_name="Tyson",
+    profile_image_url="https://example.com/mike.png",
+)
+
+
+@pytest.fixture
+def users_client(session_factory) -> TestClient:
+    app = FastAPI()
+    app.include_router(users.router)
+
+    @app.middleware("http")
+    async def attach_clerk_user(request: Request, call_next):
+        request.state.clerk_user = CLERK_USER
+        return await call_next(request)
+
+    async def get_db():
+        async with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[async_get_db] = get_db
+    return TestClient(app)
+
+
+def test_missing_fields_for_a_new_user_are_a_bad_request(users_client: TestClient) -> None:
+    response = users_client.post("/user/clerk/clerk_1", json={"first_name": "Mike"})
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Last name is required for new users"}
+
+
+def test_update_from_clerk_keeps_the_status_of_domain_errors(
+    users_client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    async def fail(**kwargs):
+        raise BadRequestException("Email is required for new users")
+
+    monkeypatch.setattr(user_service, "update_user_from_clerk", fail)
+    response = users_client.post("/user/me")
+
+    assert response.status_code == 400
+    assert response.json() == {"detail": "Email is required for new users"}